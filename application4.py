@@ -1,14 +1,27 @@
-
-
+import time
+STARTUP_STARTED = time.perf_counter()
 import sys
 import json
 import xml.etree.ElementTree as ET
+from xml.sax.saxutils import XMLGenerator
 from PyQt5.QtWidgets import QFileDialog, QMessageBox
 import os
 import shutil
 import bcrypt
+import codecs
+import gzip
+import hashlib
+import heapq
+import io
+import queue
 import secrets
-import time
+import smtplib
+import sqlite3
+import struct
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -17,48 +30,174 @@ from PyQt5.QtCore import QPoint
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QLineEdit, QPushButton, QListWidget, QMessageBox,
                              QComboBox, QDateEdit, QFormLayout, QTabWidget,
-                             QTableWidget, QTableWidgetItem, QHeaderView, QMenu, QAction, QFileDialog,
+                             QHeaderView, QMenu, QAction, QFileDialog,
+                             QTableView, QStyledItemDelegate, QStyleOptionButton, QStyle,
                              QStackedWidget, QGroupBox, QTextEdit, QScrollArea, QFrame,
-                             QDialog, QDialogButtonBox, QCheckBox, QSizePolicy, QListWidgetItem, QInputDialog)
-from PyQt5.QtCore import QDate, Qt, QSize, QSettings, QTimer
-from PyQt5.QtGui import QIcon, QPixmap, QFont, QColor, QDoubleValidator, QPalette, QLinearGradient
+                             QDialog, QDialogButtonBox, QCheckBox, QSizePolicy, QListWidgetItem, QInputDialog,
+                             QProgressDialog)
+from PyQt5.QtCore import (QDate, Qt, QSize, QSettings, QTimer, QObject, QRunnable, QThreadPool, pyqtSignal,
+                          QAbstractTableModel, QModelIndex, QEvent)
+from PyQt5.QtGui import (QIcon, QPixmap, QFont, QColor, QDoubleValidator, QPalette, QLinearGradient,
+                         QImage, QImageReader)
 from PyQt5.QtWidgets import QMenuBar, QStatusBar
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import csv
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import repeat
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+# matplotlib, numpy and sendgrid are imported on first use, see load_charting, load_numpy
+# and SendGridTransport
+IMPORTS_FINISHED = time.perf_counter()
+
+def atomic_write_json(path, data, backups=3):
+    """Replace path with data so readers only ever see a complete file; keeps path.1..path.N"""
+    # Serialise once in memory: the C encoder is only used without indent, and one write beats many
+    payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    temp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_file, 'wb') as file:
+        file.write(payload)
+        file.flush()
+        os.fsync(file.fileno())
+
+    # Rotate the previous snapshots, the live file becomes path.1 via a hard link
+    if backups and os.path.exists(path):
+        for number in range(backups - 1, 0, -1):
+            if os.path.exists(f"{path}.{number}"):
+                os.replace(f"{path}.{number}", f"{path}.{number + 1}")
+        if os.path.exists(f"{path}.1"):
+            os.remove(f"{path}.1")
+        try:
+            os.link(path, f"{path}.1")
+        except OSError:
+            shutil.copyfile(path, f"{path}.1")
+
+    os.replace(temp_file, path)
+    # Make the rename itself durable
+    if hasattr(os, 'O_DIRECTORY'):
+        directory = os.open(os.path.dirname(path) or '.', os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+def read_json_snapshot(path, backups=3):
+    """Load path, falling back to the newest readable backup; returns (data, file used) or (None, None)"""
+    for candidate in [path] + [f"{path}.{number}" for number in range(1, backups + 1)]:
+        if not os.path.exists(candidate):
+            continue
+        try:
+            with open(candidate, 'rb') as file:
+                return json.loads(file.read()), candidate
+        except ValueError as e:
+            print(f"Skipping unreadable snapshot {candidate}: {e}")
+    return None, None
 
 class UserManager:
 
     def __init__(self):
         self.users_file = 'data/users.json'
+        # Hashing runs on worker threads, so mutations of self.users are serialised
+        self.lock = threading.RLock()
+        settings = QSettings("FinanceDocManager", "AppSettings")
+        self.bcrypt_rounds = int(settings.value("bcrypt_rounds", 12))
+        self.mail_queue = MailQueue(create_mail_transport())
         self.load_users()
         # Create icons directory if it doesn't exist
         os.makedirs('icons', exist_ok=True)
 
     def load_users(self):
-        if os.path.exists(self.users_file):
-            with open(self.users_file, 'r') as file:
-                self.users = json.load(file)
-        else:
+        self.users, _ = read_json_snapshot(self.users_file)
+        if self.users is None:
             self.users = {}
+        self.rebuild_indexes()
+        if self.purge_expired_tokens():
+            self.save_users()
+
+    def rebuild_indexes(self):
+        # email -> username and sha256(reset token) -> username, plus a heap of token expiries
+        self.email_index = {}
+        self.token_index = {}
+        self.expiry_heap = []
+        for username, details in self.users.items():
+            if self.email_key(details.get("email")):
+                self.email_index[self.email_key(details["email"])] = username
+            if details.get("reset_token"):
+                self.token_index[self.token_key(details["reset_token"])] = username
+                self.schedule_expiry(username, "reset_token", details.get("token_expiry"))
+            if details.get("otp"):
+                self.schedule_expiry(username, "otp", details.get("otp_expiry"))
+
+    @staticmethod
+    def email_key(email):
+        # Users registered without an email are not indexed, so "" never finds an account
+        return (email or "").strip().lower()
+
+    @staticmethod
+    def token_key(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def schedule_expiry(self, username, kind, expiry):
+        heapq.heappush(self.expiry_heap, (expiry or "", username, kind))
+
+    def purge_expired_tokens(self):
+        """Clear reset tokens and OTPs whose expiry has passed; returns True if any were removed"""
+        now = datetime.now().isoformat()
+        purged = False
+        with self.lock:
+            while self.expiry_heap and self.expiry_heap[0][0] <= now:
+                expiry, username, kind = heapq.heappop(self.expiry_heap)
+                details = self.users.get(username)
+                if details is None:
+                    continue
+                expiry_field = "token_expiry" if kind == "reset_token" else "otp_expiry"
+                # Skip heap entries superseded by a newer token
+                if not details.get(kind) or (details.get(expiry_field) or "") != expiry:
+                    continue
+                if kind == "reset_token":
+                    self.token_index.pop(self.token_key(details["reset_token"]), None)
+                details[kind] = None
+                details[expiry_field] = None
+                purged = True
+        return purged
+
+    def find_username(self, username_or_email):
+        if username_or_email in self.users:
+            return username_or_email
+        key = self.email_key(username_or_email)
+        return self.email_index.get(key) if key else None
 
     def save_users(self):
-        with open(self.users_file, 'w') as file:
-            json.dump(self.users, file, indent=4)
+        with self.lock:
+            atomic_write_json(self.users_file, self.users)
+
+    def hash_password(self, password):
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=self.bcrypt_rounds)).decode()
 
     def add_user(self, username, email, password):
+        key = self.email_key(email)
         if username in self.users:
             return False, "Username already exists."
-        hashed_password = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
-        self.users[username] = {
-            "email": email,
-            "password": hashed_password.decode(),
-            "reset_token": None,
-            "token_expiry": None
-        }
-        self.save_users()
+        if key and key in self.email_index:
+            return False, "Email is already registered."
+        hashed_password = self.hash_password(password)
+        with self.lock:
+            if username in self.users:
+                return False, "Username already exists."
+            if key and key in self.email_index:
+                return False, "Email is already registered."
+            if key:
+                self.email_index[key] = username
+            self.users[username] = {
+                "email": email,
+                "password": hashed_password,
+                "reset_token": None,
+                "token_expiry": None
+            }
+            self.save_users()
         return True, "User registered successfully."
 
     def verify_user(self, username, password):
@@ -69,64 +208,2211 @@ class UserManager:
             return False, "User data is corrupted."
         hashed_password = user_data["password"].encode()
         if bcrypt.checkpw(password.encode(), hashed_password):
+            # Re-hash passwords stored with a different work factor than configured
+            if int(user_data["password"].split("$")[2]) != self.bcrypt_rounds:
+                new_hash = self.hash_password(password)
+                with self.lock:
+                    self.users[username]["password"] = new_hash
+                    self.save_users()
             return True, "Login successful."
         return False, "Incorrect password."
 
+    def update_profile(self, username, email, new_password=None):
+        key = self.email_key(email)
+        if key and self.email_index.get(key, username) != username:
+            return False, "Email is already registered."
+        hashed_password = self.hash_password(new_password) if new_password else None
+        with self.lock:
+            if hashed_password:
+                self.users[username]["password"] = hashed_password
+            old_key = self.email_key(self.users[username].get("email"))
+            if old_key and self.email_index.get(old_key) == username:
+                del self.email_index[old_key]
+            self.users[username]["email"] = email
+            if key:
+                self.email_index[key] = username
+            self.save_users()
+        return True, "Profile updated successfully."
+
+    @staticmethod
+    def benchmark_work_factors(cost_factors=range(10, 15), samples=3):
+        """Measure the average bcrypt hash time per cost factor on this machine"""
+        results = {}
+        for rounds in cost_factors:
+            salt = bcrypt.gensalt(rounds=rounds)
+            start = time.perf_counter()
+            for _ in range(samples):
+                bcrypt.hashpw(b"benchmark-password", salt)
+            results[rounds] = (time.perf_counter() - start) / samples
+        return results
+
     def request_reset(self, username_or_email):
-        for username, details in self.users.items():
-            if username == username_or_email or details["email"] == username_or_email:
-                token = secrets.token_urlsafe(32)
-                expiry = (datetime.now() + timedelta(hours=1)).isoformat()
-                self.users[username]["reset_token"] = token
-                self.users[username]["token_expiry"] = expiry
-                self.save_users()
-                self.send_reset_email(details["email"], token)
-                return True, "Reset token sent to your email."
-        return False, "Username or email not found."
+        self.purge_expired_tokens()
+        username = self.find_username(username_or_email)
+        if username is None:
+            return False, "Username or email not found."
+        details = self.users[username]
+        token = secrets.token_urlsafe(32)
+        expiry = (datetime.now() + timedelta(hours=1)).isoformat()
+        with self.lock:
+            if details.get("reset_token"):
+                self.token_index.pop(self.token_key(details["reset_token"]), None)
+            details["reset_token"] = token
+            details["token_expiry"] = expiry
+            self.token_index[self.token_key(token)] = username
+            self.schedule_expiry(username, "reset_token", expiry)
+            self.save_users()
+        self.send_reset_email(details["email"], token)
+        return True, "Reset token sent to your email."
 
     def reset_password(self, token, new_password):
-        for username, details in self.users.items():
-            if details["reset_token"] == token and details["token_expiry"] > datetime.now().isoformat():
-                hashed_password = bcrypt.hashpw(new_password.encode(), bcrypt.gensalt())
-                self.users[username]["password"] = hashed_password.decode()
-                self.users[username]["reset_token"] = None
-                self.users[username]["token_expiry"] = None
-                self.save_users()
-                return True, "Password reset successfully."
-        return False, "Invalid or expired token."
+        self.purge_expired_tokens()
+        username = self.token_index.get(self.token_key(token))
+        if username is None:
+            return False, "Invalid or expired token."
+        details = self.users[username]
+        if details.get("reset_token") != token or details["token_expiry"] <= datetime.now().isoformat():
+            return False, "Invalid or expired token."
+        hashed_password = self.hash_password(new_password)
+        with self.lock:
+            self.token_index.pop(self.token_key(token), None)
+            details["password"] = hashed_password
+            details["reset_token"] = None
+            details["token_expiry"] = None
+            self.save_users()
+        return True, "Password reset successfully."
 
     def send_reset_email(self, email, token):
+        # Queued for the mail worker so a slow or offline mail service never blocks the caller
+        subject = "Password Reset Request"
+        body = (
+            f"Hello,\n\n"
+            f"We received a request to reset your password. Use the following token to reset your password:\n\n"
+            f"Token: {token}\n\n"
+            f"If you did not request a password reset, please ignore this email.\n\n"
+            f"Best regards,\n"
+            f"FinanceDocManager Team"
+        )
+        self.mail_queue.send(email, subject, body)
+
+class SendGridTransport:
+
+    def __init__(self, api_key, from_email):
+        self.api_key = api_key
+        self.from_email = from_email
+
+    def send(self, to_email, subject, body):
+        if not self.api_key:
+            raise ValueError("SendGrid API key is not set.")
+        from sendgrid import SendGridAPIClient
+        from sendgrid.helpers.mail import Mail
+        message = Mail(
+            from_email=self.from_email,
+            to_emails=to_email,
+            subject=subject,
+            plain_text_content=body)
+        response = SendGridAPIClient(self.api_key).send(message)
+        print(f"Email sent successfully: {response.status_code}")
+
+def build_mail_message(from_email, to_email, subject, body):
+    message = MIMEMultipart()
+    message["From"] = from_email
+    message["To"] = to_email
+    message["Subject"] = subject
+    message.attach(MIMEText(body, "plain"))
+    return message
+
+class SMTPTransport:
+
+    def __init__(self, host, port, from_email, username=None, password=None, use_tls=True):
+        self.host = host
+        self.port = port
+        self.from_email = from_email
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+
+    def send(self, to_email, subject, body):
+        message = build_mail_message(self.from_email, to_email, subject, body)
+        with smtplib.SMTP(self.host, self.port, timeout=30) as server:
+            if self.use_tls:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password)
+            server.sendmail(self.from_email, [to_email], message.as_string())
+        print(f"Email sent successfully via {self.host}")
+
+class FileTransport:
+    """Writes each message to an outbox directory instead of sending it (for testing)"""
+
+    def __init__(self, directory, from_email):
+        self.directory = directory
+        self.from_email = from_email
+        os.makedirs(self.directory, exist_ok=True)
+
+    def send(self, to_email, subject, body):
+        message = build_mail_message(self.from_email, to_email, subject, body)
+        file_name = os.path.join(self.directory, f"{datetime.now():%Y%m%d-%H%M%S}-{secrets.token_hex(4)}.eml")
+        with open(file_name, 'w', encoding='utf-8') as file:
+            file.write(message.as_string())
+        print(f"Email written to {file_name}")
+
+def create_mail_transport():
+    """Pick the mail transport from the settings ("sendgrid", "smtp" or "file")"""
+    settings = QSettings("FinanceDocManager", "AppSettings")
+    from_email = settings.value("mail_from", "noreply@financedocmanager.com")
+    transport = os.environ.get("FINANCEDOC_MAIL_TRANSPORT") or settings.value("mail_transport", "sendgrid")
+    if transport == "smtp":
+        return SMTPTransport(settings.value("smtp_host", "localhost"), int(settings.value("smtp_port", 587)), from_email,
+                             settings.value("smtp_username"), settings.value("smtp_password"),
+                             settings.value("smtp_tls", "true") == "true")
+    outbox = settings.value("mail_outbox", os.path.join("data", "outbox"))
+    if transport == "file":
+        return FileTransport(outbox, from_email)
+    api_key = os.environ.get("SENDGRID_API_KEY") or settings.value("sendgrid_api_key")
+    if not api_key or api_key == "YOUR_SENDGRID_API_KEY":
+        # Sending with the old placeholder key could only fail, once per retry
+        print(f"No SendGrid API key is configured; emails are written to {outbox} instead.")
+        return FileTransport(outbox, from_email)
+    return SendGridTransport(api_key, from_email)
+
+class MailQueue:
+    """Background outbound mail queue with exponential backoff between retries"""
+
+    def __init__(self, transport, max_attempts=5, base_delay=2.0):
+        self.transport = transport
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.queue = queue.Queue()
+        self.retries = []  # heap of (due time, sequence, message, attempt)
+        self.sequence = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def send(self, to_email, subject, body):
+        self.queue.put((to_email, subject, body))
+
+    def run(self):
+        while True:
+            timeout = None
+            if self.retries:
+                timeout = max(0, self.retries[0][0] - time.monotonic())
+            try:
+                self.deliver(self.queue.get(timeout=timeout), 1)
+            except queue.Empty:
+                pass
+            while self.retries and self.retries[0][0] <= time.monotonic():
+                due, sequence, message, attempt = heapq.heappop(self.retries)
+                self.deliver(message, attempt)
+
+    def deliver(self, message, attempt):
         try:
-            # Directly set the SendGrid API key here or use another secure method
-            sendgrid_api_key = 'YOUR_SENDGRID_API_KEY'
-            if not sendgrid_api_key:
-                raise ValueError("SendGrid API key is not set.")
-
-            sg = SendGridAPIClient(sendgrid_api_key)
-            from_email = "noreply@financedocmanager.com"
-            to_email = email
-            subject = "Password Reset Request"
-            body = (
-                f"Hello,\n\n"
-                f"We received a request to reset your password. Use the following token to reset your password:\n\n"
-                f"Token: {token}\n\n"
-                f"If you did not request a password reset, please ignore this email.\n\n"
-                f"Best regards,\n"
-                f"FinanceDocManager Team"
-            )
-
-            message = Mail(
-                from_email=from_email,
-                to_emails=to_email,
-                subject=subject,
-                plain_text_content=body)
-
-            response = sg.send(message)
-            print(f"Email sent successfully: {response.status_code}")
+            self.transport.send(*message)
         except ValueError as ve:
+            # Configuration problems will not fix themselves, so they are not retried
             print(f"Configuration error: {ve}")
         except Exception as e:
-            print(f"Failed to send email: {e}")
+            if attempt >= self.max_attempts:
+                print(f"Failed to send email after {attempt} attempts: {e}")
+                return
+            delay = self.base_delay * 2 ** (attempt - 1)
+            print(f"Failed to send email (attempt {attempt}), retrying in {delay:g}s: {e}")
+            self.sequence += 1
+            heapq.heappush(self.retries, (time.monotonic() + delay, self.sequence, message, attempt + 1))
+
+class WorkerSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+class BackgroundTask(QRunnable):
+    """Runs a callable on a QThreadPool thread and reports back through Qt signals"""
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+class StreamSignals(QObject):
+    step = pyqtSignal(object)
+    finished = pyqtSignal(bool)
+    failed = pyqtSignal(str)
+
+class StreamTask(QRunnable):
+    """Drives a generator of (percent, payload) items on a pool thread; cancel() stops it between items"""
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.cancelled = False
+        self.signals = StreamSignals()
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        steps = None
+        try:
+            steps = self.fn(*self.args)
+            for item in steps:
+                if self.cancelled:
+                    break
+                self.signals.step.emit(item)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(not self.cancelled)
+        finally:
+            if steps is not None:
+                steps.close()
+
+class JsonBackupReader:
+    """Incremental parser for {"transactions": [...], "documents": {"<type>": [...]}} backups"""
+
+    chunk_size = 1024 * 1024
+
+    def __init__(self, file_name, batch_size=2000):
+        self.file_name = file_name
+        self.batch_size = batch_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.total = max(os.path.getsize(file_name), 1)
+        self.file = None
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def percent(self):
+        return int(self.file.tell() * 100 / self.total)
+
+    def fill(self):
+        """Append the next chunk to the buffer, dropping what was consumed; False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + self.text_decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        return not self.eof
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Malformed backup: expected '{char}' near byte {self.file.tell()}")
+        self.pos += 1
+
+    def skip_comma(self):
+        if self.peek() == ',':
+            self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Usually a value cut by the chunk boundary
+                if not self.fill():
+                    raise
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def array(self, collection):
+        self.expect('[')
+        batch = []
+        count = 0
+        while self.peek() != ']':
+            batch.append(self.value())
+            count += 1
+            self.skip_comma()
+            if len(batch) >= self.batch_size:
+                yield self.percent(), (collection, batch)
+                batch = []
+        self.pos += 1
+        # An empty array still yields, so an empty collection (e.g. a custom tab) is restored too
+        if batch or not count:
+            yield self.percent(), (collection, batch)
+
+    def __iter__(self):
+        with open(self.file_name, 'rb') as self.file:
+            self.expect('{')
+            while self.peek() != '}':
+                key = self.value()
+                self.expect(':')
+                if key == "transactions":
+                    yield from self.array("transactions")
+                elif key == "backup":
+                    yield self.percent(), ("_backup", [self.value()])
+                elif key == "documents":
+                    self.expect('{')
+                    while self.peek() != '}':
+                        doc_type = self.value()
+                        self.expect(':')
+                        yield from self.array(doc_type)
+                        self.skip_comma()
+                    self.pos += 1
+                else:
+                    self.value()  # e.g. journal_seq of a copied data.json
+                self.skip_comma()
+
+def iter_json_backup(file_name, batch_size=2000):
+    yield from JsonBackupReader(file_name, batch_size)
+
+def iter_csv_backup(file_name, batch_size=2000):
+    """CSV backups only carry transactions"""
+    total = max(os.path.getsize(file_name), 1)
+    with open(file_name, 'rb') as raw:
+        reader = csv.DictReader(io.TextIOWrapper(raw, newline=''))
+        batch = []
+        for row in reader:
+            batch.append({
+                "type": row["Type"],
+                "category": row["Category"],
+                "date": row["Date"],
+                "amount": float(row["Amount"]),
+                "description": row["Description"]
+            })
+            if len(batch) >= batch_size:
+                yield int(raw.tell() * 100 / total), ("transactions", batch)
+                batch = []
+        if batch:
+            yield 100, ("transactions", batch)
+
+def iter_xml_backup(file_name, batch_size=2000):
+    total = max(os.path.getsize(file_name), 1)
+    batches = {}
+    seen = set()
+    parents = []
+    with open(file_name, 'rb') as file:
+        for event, elem in ET.iterparse(file, events=("start", "end")):
+            if event == "start":
+                parents.append(elem)
+                continue
+            parents.pop()
+            if elem.tag == "transaction":
+                collection = "transactions"
+            elif elem.tag == "document" and parents:
+                collection = parents[-1].tag
+            elif elem.tag == "backup":
+                collection = "_backup"
+            elif parents and parents[-1].tag == "documents":
+                # An empty collection element still restores as an empty collection
+                if elem.tag not in seen:
+                    batches[elem.tag] = []
+                continue
+            else:
+                continue
+            record = {child.tag: child.text for child in elem}
+            if collection == "transactions":
+                record["amount"] = float(record["amount"])
+            # XML carries text only; revision metadata is numeric
+            for key in ("_id", "_rev", "since", "revision"):
+                if record.get(key) is not None:
+                    record[key] = int(record[key])
+            # Drop the parsed element so the tree never holds more than the current record
+            elem.clear()
+            if parents:
+                parents[-1].remove(elem)
+            if collection == "_backup":
+                # The header comes first, as read_backup_meta expects
+                yield int(file.tell() * 100 / total), (collection, [record])
+                continue
+            seen.add(collection)
+            batch = batches.setdefault(collection, [])
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield int(file.tell() * 100 / total), (collection, batches.pop(collection))
+    for collection, batch in batches.items():
+        yield 100, (collection, batch)
+
+@contextmanager
+def exporting(file_name):
+    """Yield a temp path that replaces file_name only if the export runs to the end"""
+    temp_file = file_name + '.part'
+    try:
+        yield temp_file
+    except BaseException:
+        # Includes GeneratorExit when a cancelled export generator is closed
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+    os.replace(temp_file, file_name)
+
+def iter_csv_export(file_name, transactions, batch_size=2000):
+    total = max(len(transactions), 1)
+    with exporting(file_name) as temp_file:
+        with open(temp_file, mode='w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(["Type", "Category", "Date", "Amount", "Description"])
+            for start in range(0, len(transactions), batch_size):
+                for transaction in transactions[start:start + batch_size]:
+                    writer.writerow([transaction["type"], transaction["category"], transaction["date"], transaction["amount"], transaction["description"]])
+                yield (start + batch_size) * 100 // total, None
+
+def iter_json_export(file_name, transactions, documents, meta=None, batch_size=2000):
+    total = max(len(transactions) + sum(len(docs) for docs in documents.values()), 1)
+    written = 0
+    with exporting(file_name) as temp_file:
+        with open(temp_file, 'w', encoding='utf-8') as file:
+            # One record per line, so the file is written (and later restored) record by record
+            file.write('{')
+            if meta is not None:
+                file.write('"backup": ' + json.dumps(meta) + ',\n')
+            file.write('"transactions": [')
+            for i, transaction in enumerate(transactions):
+                file.write((',\n' if i else '\n') + json.dumps(transaction))
+                written += 1
+                if written % batch_size == 0:
+                    yield written * 100 // total, None
+            file.write('\n],\n"documents": {')
+            for j, (doc_type, docs) in enumerate(documents.items()):
+                file.write((',\n' if j else '\n') + json.dumps(doc_type) + ': [')
+                for i, doc in enumerate(docs):
+                    file.write((',\n' if i else '\n') + json.dumps(doc))
+                    written += 1
+                    if written % batch_size == 0:
+                        yield written * 100 // total, None
+                file.write('\n]')
+            file.write('\n}}\n')
+    yield 100, None
+
+def iter_xml_export(file_name, transactions, documents, meta=None, batch_size=2000):
+    total = max(len(transactions) + sum(len(docs) for docs in documents.values()), 1)
+    written = 0
+    with exporting(file_name) as temp_file:
+        with open(temp_file, 'wb') as file:
+            xml = XMLGenerator(file, encoding='utf-8', short_empty_elements=True)
+
+            def element(tag, fields):
+                xml.startElement(tag, {})
+                for key, value in fields.items():
+                    xml.startElement(key, {})
+                    xml.characters(str(value))
+                    xml.endElement(key)
+                xml.endElement(tag)
+
+            xml.startDocument()
+            xml.startElement("data", {})
+            if meta is not None:
+                element("backup", meta)
+            xml.startElement("transactions", {})
+            for trans in transactions:
+                element("transaction", trans)
+                written += 1
+                if written % batch_size == 0:
+                    yield written * 100 // total, None
+            xml.endElement("transactions")
+            xml.startElement("documents", {})
+            for doc_type, docs in documents.items():
+                xml.startElement(doc_type, {})
+                for doc in docs:
+                    element("document", doc)
+                    written += 1
+                    if written % batch_size == 0:
+                        yield written * 100 // total, None
+                xml.endElement(doc_type)
+            xml.endElement("documents")
+            xml.endElement("data")
+            xml.endDocument()
+    yield 100, None
+
+# Binary backup (.pimb): b"PIMB", schema version, codec, then a compressed stream of
+# chunks. Each chunk is a length-prefixed JSON header describing up to 65536 rows of one
+# collection, followed by one little-endian column per record key.
+BINARY_BACKUP_MAGIC = b"PIMB"
+# Version 2 marks None values in the column masks (see encode_chunk)
+BINARY_BACKUP_VERSION = 2
+BINARY_CODEC_GZIP = 1
+BINARY_CODEC_ZSTD = 2
+
+def little_endian(values):
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+def read_exact(stream, size):
+    data = b''
+    while len(data) < size:
+        part = stream.read(size - len(data))
+        if not part:
+            raise ValueError("Binary backup is truncated.")
+        data += part
+    return data
+
+def encode_column(values):
+    """Returns (kind, parts) for one column; missing and None values are None in values"""
+    present = [value for value in values if value is not None]
+    kinds = {type(value) for value in present}
+    if kinds == {float}:
+        return "f64", [little_endian(array('d', [0.0 if v is None else v for v in values])).tobytes()]
+    if kinds == {int} and all(-2 ** 63 <= v < 2 ** 63 for v in present):
+        return "i64", [little_endian(array('q', [0 if v is None else v for v in values])).tobytes()]
+    if kinds == {str} and len(set(present)) * 2 <= len(values):
+        # Few distinct values (types, categories, dates): store a table and codes
+        table = list(dict.fromkeys(present))
+        codes = {value: code for code, value in enumerate(table)}
+        return "dict", [json.dumps(table).encode('utf-8'),
+                        little_endian(array('I', [codes.get(v, 0) for v in values])).tobytes()]
+    if kinds == {str}:
+        strings = ['' if v is None else v for v in values]
+    else:
+        strings = [json.dumps(v) for v in values]
+    if not any('\0' in v for v in strings):
+        # NUL-separated text splits back in one C call
+        return ("str" if kinds == {str} else "json"), ['\0'.join(strings).encode('utf-8')]
+    # Lengths are in characters, so the blob is decoded once and sliced
+    lengths = little_endian(array('I', [len(v) for v in strings]))
+    return ("str" if kinds == {str} else "json"), [lengths.tobytes(), ''.join(strings).encode('utf-8')]
+
+def decode_column(kind, parts):
+    if kind == "f64":
+        return little_endian(array('d', parts[0])).tolist()
+    if kind == "i64":
+        return little_endian(array('q', parts[0])).tolist()
+    if kind == "dict":
+        table = json.loads(parts[0])
+        return list(map(table.__getitem__, little_endian(array('I', parts[1]))))
+    if len(parts) == 1:
+        values = parts[0].decode('utf-8').split('\0')
+    else:
+        lengths = little_endian(array('I', parts[0]))
+        text = parts[1].decode('utf-8')
+        values = []
+        start = 0
+        for length in lengths:
+            values.append(text[start:start + length])
+            start += length
+    if kind == "json":
+        values = list(map(json.loads, values))
+    return values
+
+def encode_chunk(collection, records):
+    keys = list(dict.fromkeys(key for record in records for key in record))
+    header = {"collection": collection, "rows": len(records), "columns": []}
+    payload = []
+    for key in keys:
+        values = [record.get(key) for record in records]
+        column = {"key": key}
+        if any(value is None for value in values):
+            # Per row: 0 key absent, 1 value stored in the column, 2 value is None
+            column["mask"] = True
+            payload.append(bytes(0 if key not in record else 2 if record[key] is None else 1
+                                 for record in records))
+        column["kind"], parts = encode_column(values)
+        column["sizes"] = [len(part) for part in parts]
+        payload.extend(parts)
+        header["columns"].append(column)
+    header_bytes = json.dumps(header).encode('utf-8')
+    return struct.pack('<I', len(header_bytes)) + header_bytes + b''.join(payload)
+
+def decode_chunk(stream):
+    """Read one chunk; returns (collection, records) or None at the end of the stream"""
+    prefix = stream.read(4)
+    if not prefix:
+        return None
+    if len(prefix) < 4:
+        prefix += read_exact(stream, 4 - len(prefix))
+    header = json.loads(read_exact(stream, struct.unpack('<I', prefix)[0]))
+    keys, columns, masks = [], [], []
+    for column in header["columns"]:
+        mask = read_exact(stream, header["rows"]) if column.get("mask") else None
+        parts = [read_exact(stream, size) for size in column["sizes"]]
+        keys.append(column["key"])
+        columns.append(decode_column(column["kind"], parts))
+        masks.append(mask)
+    if not any(mask is not None for mask in masks):
+        records = list(map(dict, map(zip, repeat(keys), zip(*columns))))
+    else:
+        records = [{key: None if mask is not None and mask[i] == 2 else value
+                    for key, value, mask in zip(keys, row, masks) if mask is None or mask[i]}
+                   for i, row in enumerate(zip(*columns))]
+    if not keys:
+        records = [{} for _ in range(header["rows"])]
+    return header["collection"], records
+
+def iter_binary_export(file_name, transactions, documents, meta=None, chunk_rows=65536):
+    collections = [("transactions", transactions)] + list(documents.items())
+    if meta is not None:
+        collections.insert(0, ("_backup", [meta]))
+    total = max(sum(len(records) for _, records in collections), 1)
+    written = 0
+    codec = BINARY_CODEC_ZSTD if zstandard is not None else BINARY_CODEC_GZIP
+    with exporting(file_name) as temp_file:
+        with open(temp_file, 'wb') as raw:
+            raw.write(BINARY_BACKUP_MAGIC + bytes([BINARY_BACKUP_VERSION, codec]))
+            if codec == BINARY_CODEC_ZSTD:
+                stream = zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False)
+            else:
+                stream = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6)
+            with stream:
+                for collection, records in collections:
+                    # Empty collections still get a chunk so custom tabs without entries survive
+                    for start in range(0, max(len(records), 1), chunk_rows):
+                        stream.write(encode_chunk(collection, records[start:start + chunk_rows]))
+                        written += len(records[start:start + chunk_rows])
+                        yield written * 100 // total, None
+    yield 100, None
+
+def iter_binary_backup(file_name):
+    total = max(os.path.getsize(file_name), 1)
+    with open(file_name, 'rb') as raw:
+        header = raw.read(6)
+        if len(header) < 6 or header[:4] != BINARY_BACKUP_MAGIC:
+            raise ValueError("Not a binary backup file.")
+        if header[4] > BINARY_BACKUP_VERSION:
+            raise ValueError(f"Binary backup version {header[4]} is newer than this application supports.")
+        if header[5] == BINARY_CODEC_ZSTD:
+            if zstandard is None:
+                raise ValueError("This backup is zstd-compressed; install the zstandard package to restore it.")
+            stream = zstandard.ZstdDecompressor().stream_reader(raw)
+        else:
+            stream = gzip.GzipFile(fileobj=raw, mode='rb')
+        with stream:
+            while True:
+                chunk = decode_chunk(stream)
+                if chunk is None:
+                    break
+                yield int(raw.tell() * 100 / total), chunk
+
+BACKUP_READERS = {'.json': iter_json_backup, '.csv': iter_csv_backup, '.xml': iter_xml_backup,
+                  '.pimb': iter_binary_backup}
+
+def read_backup_meta(file_name):
+    """The backup header ({"kind", "revision", "since"}) written first in a backup, or None"""
+    items = BACKUP_READERS[os.path.splitext(file_name)[1].lower()](file_name)
+    try:
+        for _, (collection, records) in items:
+            return records[0] if collection == "_backup" else None
+    finally:
+        items.close()
+    return None
+
+def iter_backup_chain(file_names, batch_size=2000):
+    """Replay a full backup plus the differential backups taken after it, merged by record _id"""
+    metas = []
+    for file_name in file_names:
+        meta = read_backup_meta(file_name)
+        if meta is None:
+            raise ValueError(f"{os.path.basename(file_name)} has no revision information; "
+                             f"only backups made by this version can be chained.")
+        metas.append((meta, file_name))
+    bases = [item for item in metas if item[0]["kind"] == "full"]
+    if len(bases) != 1:
+        raise ValueError("Select exactly one full backup together with its differential backups.")
+    chain = bases + sorted((item for item in metas if item[0]["kind"] == "delta"), key=lambda item: item[0]["since"])
+    revision = chain[0][0]["revision"]
+    for meta, file_name in chain[1:]:
+        if meta["since"] != revision:
+            raise ValueError(f"{os.path.basename(file_name)} starts at revision {meta['since']}, "
+                             f"but the chain is at revision {revision}.")
+        revision = meta["revision"]
+
+    collections = {}
+    unnumbered = 0
+    for position, (meta, file_name) in enumerate(chain):
+        for percent, (collection, records) in BACKUP_READERS[os.path.splitext(file_name)[1].lower()](file_name):
+            if collection == "_backup":
+                continue
+            if collection == "_tombstones":
+                for tombstone in records:
+                    collections.get(tombstone["collection"], {}).pop(tombstone["_id"], None)
+                continue
+            # Updates keep the record's original position, new records go to the end
+            target = collections.setdefault(collection, {})
+            for record in records:
+                if "_id" in record:
+                    target[record["_id"]] = record
+                else:
+                    unnumbered += 1
+                    target[("unnumbered", unnumbered)] = record
+            yield (position * 100 + percent) * 90 // (100 * len(chain)), None
+
+    # Lets the app continue numbering revisions after the restored chain
+    yield 90, ("_backup", [{"kind": "chain", "revision": revision}])
+    for collection, records in collections.items():
+        records = list(records.values())
+        for start in range(0, len(records), batch_size):
+            yield 90, (collection, records[start:start + batch_size])
+        if not records:
+            yield 90, (collection, [])
+
+class DataJournal:
+    """Append-only journal of data mutations, periodically compacted into data.json"""
+
+    supports_queries = False
+
+    def __init__(self, data_dir, compact_every=500):
+        self.snapshot_file = os.path.join(data_dir, 'data.json')
+        self.journal_file = os.path.join(data_dir, 'data.journal')
+        self.compact_every = compact_every
+        self.seq = 0
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.compaction_thread = None
+        self.handle = None
+        # (seq, line) entries appended but not written yet; flush() writes them in one go
+        self.buffer = []
+        # Problems the last load recovered from, for the app to show; empty after a clean load
+        self.recovery = []
+
+    def load(self):
+        self.recovery = []
+        data, used_file = read_json_snapshot(self.snapshot_file)
+        if used_file is not None and used_file != self.snapshot_file:
+            self.recovery.append(f"{self.snapshot_file} could not be read; loaded the backup {used_file}.")
+        elif used_file is None and os.path.exists(self.snapshot_file):
+            self.recovery.append(f"{self.snapshot_file} and its backups could not be read; "
+                                 f"only changes from the journal were loaded.")
+        data = data or {}
+        transactions = data.get("transactions", [])
+        documents = data.get("documents", {
+            "aadhar": [],
+            "pan": [],
+            "bank_accounts": [],
+            "driving_license": [],
+            "certificates": []
+        })
+        self.seq = data.get("journal_seq", 0)
+        self.pending = 0
+        self.buffer = []
+
+        # Replay mutations recorded after the snapshot was written
+        entries = [entry for entry in self.read_entries() if entry["seq"] > self.seq]
+        if entries and entries[0]["seq"] != self.seq + 1:
+            # The journal was trimmed against a newer snapshot than the backup we fell back to.
+            # Move it aside so new appends, numbered from the backup's seq, start a fresh journal
+            skipped_file = f"{self.journal_file}.skipped-{int(time.time())}"
+            os.replace(self.journal_file, skipped_file)
+            self.recovery.append(f"The journal does not continue {used_file}; its {len(entries)} "
+                                 f"unapplied changes were moved to {skipped_file}.")
+            entries = []
+        for entry in entries:
+            if entry["col"] == "transactions":
+                records = transactions
+            else:
+                records = documents.setdefault(entry["col"], [])
+            if entry["op"] == "add":
+                records.append(entry["record"])
+            elif entry["op"] == "update":
+                records[entry["index"]] = entry["record"]
+            elif entry["op"] == "delete":
+                del records[entry["index"]]
+            self.seq = entry["seq"]
+            self.pending += 1
+
+        return transactions, documents
+
+    def read_entries(self, path=None):
+        path = path or self.journal_file
+        if not os.path.exists(path):
+            return []
+        entries = []
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A torn last line from an interrupted write is ignored
+                    break
+        return entries
+
+    def append(self, op, collection, index=None, record=None, record_id=None):
+        """Record one mutation; returns True once enough entries piled up to compact"""
+        # Replay goes by position, so record_id is not written
+        with self.lock:
+            self.seq += 1
+            entry = {"seq": self.seq, "op": op, "col": collection}
+            if index is not None:
+                entry["index"] = index
+            if record is not None:
+                entry["record"] = record
+            # Serialised now, the record may be replaced before the flush
+            self.buffer.append((self.seq, json.dumps(entry, separators=(',', ':')) + '\n'))
+            self.pending += 1
+            return self.pending >= self.compact_every
+
+    def flush(self):
+        """Write every buffered entry with a single write and fsync"""
+        with self.lock:
+            if not self.buffer:
+                return
+            if self.handle is None:
+                self.handle = open(self.journal_file, 'a', encoding='utf-8')
+            self.handle.write("".join(line for _, line in self.buffer))
+            self.handle.flush()
+            os.fsync(self.handle.fileno())
+            self.buffer = []
+
+    def write_snapshot(self, transactions, documents, seq):
+        data = {
+            "transactions": transactions,
+            "documents": documents,
+            "journal_seq": seq
+        }
+        atomic_write_json(self.snapshot_file, data)
+
+        # Drop the entries now covered by the snapshot, keeping any appended meanwhile
+        with self.lock:
+            if self.handle is not None:
+                self.handle.close()
+                self.handle = None
+            remaining = [entry for entry in self.read_entries() if entry["seq"] > seq]
+            # Buffered entries the snapshot already covers need never be written
+            self.buffer = [(entry_seq, line) for entry_seq, line in self.buffer if entry_seq > seq]
+            if remaining:
+                with open(self.journal_file + '.tmp', 'w', encoding='utf-8') as file:
+                    for entry in remaining:
+                        file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+                os.replace(self.journal_file + '.tmp', self.journal_file)
+            elif os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+            self.pending = len(remaining) + len(self.buffer)
+
+    def save(self, transactions, documents):
+        """Write a full snapshot synchronously, folding the journal into it"""
+        self.wait_for_compaction()
+        with self.lock:
+            seq = self.seq
+        self.write_snapshot(transactions, documents, seq)
+
+    def compact(self, transactions, documents):
+        """Fold the journal into the snapshot on a background thread"""
+        if self.compaction_thread is not None and self.compaction_thread.is_alive():
+            return
+        with self.lock:
+            if self.pending == 0:
+                return
+            seq = self.seq
+        # Shallow copies so the GUI thread can keep mutating the live lists
+        transactions = list(transactions)
+        documents = {doc_type: list(docs) for doc_type, docs in documents.items()}
+        self.compaction_thread = threading.Thread(
+            target=self.write_snapshot, args=(transactions, documents, seq), daemon=True)
+        self.compaction_thread.start()
+
+    def wait_for_compaction(self):
+        if self.compaction_thread is not None:
+            self.compaction_thread.join()
+            self.compaction_thread = None
+
+class SQLiteStorage:
+    """Indexed SQLite storage; filters and aggregates are pushed down to SQL"""
+
+    supports_queries = True
+    recovery = []
+
+    # Fields matched by the search bars, per document collection
+    search_fields = {
+        "aadhar": ["name", "number", "dob", "address"],
+        "pan": ["name", "number", "dob", "address"],
+        "bank_accounts": ["name", "account_number", "ifsc", "branch", "address"],
+        "driving_license": ["name", "number", "dob", "address"],
+        "certificates": ["name", "issuer", "date", "description"]
+    }
+
+    def __init__(self, data_dir):
+        self.db_file = os.path.join(data_dir, 'data.db')
+        self.json_file = os.path.join(data_dir, 'data.json')
+        is_new = not os.path.exists(self.db_file)
+        self.conn = sqlite3.connect(self.db_file)
+        self.conn.row_factory = sqlite3.Row
+        self.create_schema()
+        if is_new and os.path.exists(self.json_file):
+            # First run on SQLite: import the existing JSON data
+            self.save(*DataJournal(data_dir).load())
+
+    def create_schema(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS transactions (
+                id INTEGER PRIMARY KEY,
+                type TEXT NOT NULL,
+                category TEXT NOT NULL,
+                date TEXT NOT NULL,
+                amount REAL NOT NULL,
+                description TEXT NOT NULL DEFAULT '',
+                record_id INTEGER,
+                rev INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
+            CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions(type, date);
+            CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions(category, date);
+            CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions(amount);
+
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                collection TEXT NOT NULL,
+                name TEXT,
+                number TEXT,
+                search_text TEXT NOT NULL DEFAULT '',
+                record TEXT NOT NULL,
+                record_id INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_documents_name ON documents(collection, name);
+            CREATE INDEX IF NOT EXISTS idx_documents_number ON documents(collection, number);
+        """)
+        # Databases created before records carried revision metadata
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(transactions)")}
+        if "record_id" not in columns:
+            self.conn.execute("ALTER TABLE transactions ADD COLUMN record_id INTEGER")
+            self.conn.execute("ALTER TABLE transactions ADD COLUMN rev INTEGER")
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(documents)")}
+        if "record_id" not in columns:
+            self.conn.execute("ALTER TABLE documents ADD COLUMN record_id INTEGER")
+            self.conn.executemany("UPDATE documents SET record_id = ? WHERE id = ?",
+                                  [(json.loads(row["record"]).get("_id"), row["id"])
+                                   for row in self.conn.execute("SELECT id, record FROM documents")])
+        # Updates and deletes find their row by the record's _id
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_record ON transactions(record_id)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_record ON documents(collection, record_id)")
+        self.conn.commit()
+
+    def document_row(self, collection, record):
+        fields = self.search_fields.get(collection, list(record.keys()))
+        search_text = "\n".join(str(record.get(field, "")) for field in fields).lower()
+        number = record.get("number", record.get("account_number"))
+        return (collection, record.get("name"), number, search_text, json.dumps(record), record.get("_id"))
+
+    def load(self):
+        transactions = [self.transaction_from_row(row) for row in
+                        self.conn.execute("SELECT * FROM transactions ORDER BY id")]
+        documents = {
+            "aadhar": [],
+            "pan": [],
+            "bank_accounts": [],
+            "driving_license": [],
+            "certificates": []
+        }
+        for row in self.conn.execute("SELECT collection, record FROM documents ORDER BY id"):
+            documents.setdefault(row["collection"], []).append(json.loads(row["record"]))
+        return transactions, documents
+
+    def transaction_from_row(self, row):
+        transaction = {
+            "type": row["type"],
+            "category": row["category"],
+            "date": row["date"],
+            "amount": row["amount"],
+            "description": row["description"]
+        }
+        if row["record_id"] is not None:
+            transaction["_id"] = row["record_id"]
+            transaction["_rev"] = row["rev"]
+        return transaction
+
+    def transaction_values(self, record):
+        return (record["type"], record["category"], record["date"], record["amount"], record["description"],
+                record.get("_id"), record.get("_rev"))
+
+    def row_id(self, collection, index, record_id=None):
+        if record_id is not None:
+            if collection == "transactions":
+                row = self.conn.execute("SELECT id FROM transactions WHERE record_id = ? ORDER BY id LIMIT 1",
+                                        (record_id,)).fetchone()
+            else:
+                row = self.conn.execute("SELECT id FROM documents WHERE collection = ? AND record_id = ? "
+                                        "ORDER BY id LIMIT 1", (collection, record_id)).fetchone()
+            if row is not None:
+                return row["id"]
+        # Records without an _id are addressed by their position in insertion order
+        if collection == "transactions":
+            row = self.conn.execute("SELECT id FROM transactions ORDER BY id LIMIT 1 OFFSET ?",
+                                    (index,)).fetchone()
+        else:
+            row = self.conn.execute("SELECT id FROM documents WHERE collection = ? ORDER BY id LIMIT 1 OFFSET ?",
+                                    (collection, index)).fetchone()
+        if row is None:
+            raise IndexError(f"No {collection} record at index {index}")
+        return row["id"]
+
+    def append(self, op, collection, index=None, record=None, record_id=None):
+        if collection == "transactions":
+            if op == "add":
+                self.conn.execute(
+                    "INSERT INTO transactions (type, category, date, amount, description, record_id, rev) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    self.transaction_values(record))
+            elif op == "update":
+                self.conn.execute(
+                    "UPDATE transactions SET type = ?, category = ?, date = ?, amount = ?, description = ?, "
+                    "record_id = ?, rev = ? WHERE id = ?",
+                    self.transaction_values(record) + (self.row_id(collection, index, record_id),))
+            elif op == "delete":
+                self.conn.execute("DELETE FROM transactions WHERE id = ?",
+                                  (self.row_id(collection, index, record_id),))
+        else:
+            if op == "add":
+                self.conn.execute(
+                    "INSERT INTO documents (collection, name, number, search_text, record, record_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    self.document_row(collection, record))
+            elif op == "update":
+                self.conn.execute(
+                    "UPDATE documents SET collection = ?, name = ?, number = ?, search_text = ?, record = ?, "
+                    "record_id = ? WHERE id = ?",
+                    self.document_row(collection, record) + (self.row_id(collection, index, record_id),))
+            elif op == "delete":
+                self.conn.execute("DELETE FROM documents WHERE id = ?",
+                                  (self.row_id(collection, index, record_id),))
+        # Changes are committed by flush(), a burst of them as one transaction; nothing to compact
+        return False
+
+    def flush(self):
+        self.conn.commit()
+
+    def save(self, transactions, documents):
+        with self.conn:
+            self.conn.execute("DELETE FROM transactions")
+            self.conn.execute("DELETE FROM documents")
+            self.conn.executemany(
+                "INSERT INTO transactions (type, category, date, amount, description, record_id, rev) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self.transaction_values(trans) for trans in transactions])
+            self.conn.executemany(
+                "INSERT INTO documents (collection, name, number, search_text, record, record_id) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [self.document_row(doc_type, doc) for doc_type, docs in documents.items() for doc in docs])
+
+    def compact(self, transactions, documents):
+        pass
+
+    def wait_for_compaction(self):
+        pass
+
+    def query_transactions(self, trans_type=None, category=None, date_from=None, date_to=None,
+                           amount_from=None, amount_to=None, keyword=None, sort_by=None, descending=False):
+        clauses = []
+        params = []
+        if trans_type:
+            clauses.append("type = ?")
+            params.append(trans_type)
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if date_from:
+            clauses.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("date <= ?")
+            params.append(date_to)
+        if amount_from is not None:
+            clauses.append("amount >= ?")
+            params.append(amount_from)
+        if amount_to is not None:
+            clauses.append("amount <= ?")
+            params.append(amount_to)
+        if keyword:
+            clauses.append("instr(lower(description), ?) > 0")
+            params.append(keyword.lower())
+        sql = "SELECT * FROM transactions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        order_column = {"Date": "date", "Amount": "amount", "Category": "category"}.get(sort_by, "id")
+        sql += f" ORDER BY {order_column} {'DESC' if descending else 'ASC'}, id"
+        return [self.transaction_from_row(row) for row in self.conn.execute(sql, params)]
+
+    def search_documents(self, collection, query):
+        rows = self.conn.execute(
+            "SELECT record FROM documents WHERE collection = ? AND instr(search_text, ?) > 0 ORDER BY id",
+            (collection, query.lower()))
+        return [json.loads(row["record"]) for row in rows]
+
+def create_storage(data_dir):
+    """Pick the storage backend from the settings ("json" or "sqlite")"""
+    settings = QSettings("FinanceDocManager", "AppSettings")
+    backend = os.environ.get("FINANCEDOC_STORAGE") or settings.value("storage_backend", "json")
+    if backend == "sqlite":
+        return SQLiteStorage(data_dir)
+    return DataJournal(data_dir)
+
+class BlobStore:
+    """Content-addressed store for document images: files are named by their sha256"""
+
+    image_fields = ["front_image", "back_image", "passbook_image", "image"]
+    # Unreferenced files wait this long in the trash before they are deleted
+    trash_days = 30
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.trash = os.path.join(directory, "trash")
+        self.refcounts = {}
+        # Blobs copied in but not yet referenced by a saved record; never collected
+        self.pending = set()
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def put(self, source_path):
+        """Copy source_path into the store unless identical content is already there"""
+        digest = hashlib.sha256()
+        with open(source_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        name = digest.hexdigest() + os.path.splitext(source_path)[1].lower()
+        with self.lock:
+            self.pending.add(name)
+        target = self.path(name)
+        if not os.path.exists(target):
+            temp_file = f"{target}.{threading.get_ident()}.tmp"
+            shutil.copyfile(source_path, temp_file)
+            os.replace(temp_file, target)
+        return name
+
+    @staticmethod
+    def name_of(value):
+        # Older data saved on Windows carries backslash-separated paths
+        return os.path.basename(value.replace('\\', '/'))
+
+    def resolve(self, value):
+        """Path of the stored file for an image field value"""
+        return self.path(self.name_of(value))
+
+    def names(self, record):
+        """Blob names referenced by a document record (stored as bare names or full paths)"""
+        return [self.name_of(record[field]) for field in self.image_fields if record.get(field)]
+
+    def rebuild(self, documents):
+        with self.lock:
+            self.refcounts = {}
+        for docs in documents.values():
+            for record in docs:
+                self.ref(record)
+        self.recover_from_trash()
+
+    def recover_from_trash(self):
+        """Move referenced files back out of the trash, e.g. after restoring an older backup"""
+        if not os.path.isdir(self.trash):
+            return
+        with self.lock:
+            for name in os.listdir(self.trash):
+                if name in self.refcounts and not os.path.exists(self.path(name)):
+                    os.replace(os.path.join(self.trash, name), self.path(name))
+
+    def ref(self, record):
+        with self.lock:
+            for name in self.names(record):
+                self.refcounts[name] = self.refcounts.get(name, 0) + 1
+                self.pending.discard(name)
+
+    def unref(self, record):
+        with self.lock:
+            for name in self.names(record):
+                count = self.refcounts.get(name, 0) - 1
+                if count > 0:
+                    self.refcounts[name] = count
+                else:
+                    self.refcounts.pop(name, None)
+
+    def collect_garbage(self):
+        """Move files no record references to the trash and empty it of expired ones; returns the names moved"""
+        os.makedirs(self.trash, exist_ok=True)
+        moved = []
+        for name in os.listdir(self.directory):
+            path = self.path(name)
+            if not os.path.isfile(path) or name.endswith('.tmp'):
+                continue
+            with self.lock:
+                if name in self.refcounts or name in self.pending:
+                    continue
+                trashed = os.path.join(self.trash, name)
+                os.replace(path, trashed)
+                # The grace period counts from the move, not from when the image was added
+                os.utime(trashed)
+            moved.append(name)
+        expiry = time.time() - self.trash_days * 86400
+        for name in os.listdir(self.trash):
+            trashed = os.path.join(self.trash, name)
+            if os.path.getmtime(trashed) < expiry:
+                os.remove(trashed)
+        return moved
+
+# List items keep the _id of the record they show under this role (UserRole holds the thumbnail path)
+RECORD_ID_ROLE = Qt.UserRole + 1
+
+class RecordIndex:
+    """_id -> (collection, record) for every record, so the UI addresses records by id, not by row"""
+
+    def __init__(self):
+        self.rebuild([], {})
+
+    def rebuild(self, transactions, documents):
+        self.records = {trans["_id"]: ("transactions", trans) for trans in transactions}
+        for doc_type, docs in documents.items():
+            if not doc_type.startswith("_"):
+                self.records.update((doc["_id"], (doc_type, doc)) for doc in docs)
+        # collection -> {_id: position in its list}, built on first use
+        self.rows = {}
+        # collection -> positions below this are current; later ones are recounted on demand
+        self.valid = {}
+
+    def add(self, collection, record):
+        self.records[record["_id"]] = (collection, record)
+        rows = self.rows.get(collection)
+        if rows is not None:
+            rows[record["_id"]] = len(rows)  # Appended at the end
+
+    def replace(self, collection, old_record, record):
+        if old_record["_id"] != record["_id"]:
+            self.remove(collection, old_record)
+            self.add(collection, record)
+        else:
+            self.records[record["_id"]] = (collection, record)
+
+    def remove(self, collection, record):
+        self.records.pop(record["_id"], None)
+        rows = self.rows.get(collection)
+        if rows is not None:
+            # Everything after the record moved up one position; only that tail goes stale
+            position = rows.pop(record["_id"], 0)
+            self.valid[collection] = min(self.valid[collection], position)
+
+    def get(self, record_id):
+        return self.records.get(record_id, (None, None))
+
+    def row(self, collection, records, record_id):
+        """Position of a record in its collection's list, or None"""
+        rows = self.rows.get(collection)
+        if rows is None:
+            rows = self.rows[collection] = {}
+            self.valid[collection] = 0
+        start = self.valid[collection]
+        if start < len(records):
+            row = rows.get(record_id)
+            if row is not None and row < start:
+                return row
+            for row in range(start, len(records)):
+                rows[records[row]["_id"]] = row
+            self.valid[collection] = len(records)
+        return rows.get(record_id)
+
+class SearchIndex:
+    """Incrementally maintained trigram index over the fields the header search bar matches"""
+
+    # Collection -> (result category, searchable fields)
+    collections = {
+        "transactions": ("Transactions", ["description", "category", "date", "amount"]),
+        "aadhar": ("Aadhar Cards", ["name", "number", "dob", "address"]),
+        "pan": ("PAN Cards", ["name", "number", "dob", "address"]),
+        "bank_accounts": ("Bank Accounts", ["name", "account_number", "ifsc", "branch", "address"]),
+        "driving_license": ("Driving Licenses", ["name", "number", "dob", "address"]),
+        "certificates": ("Certificates", ["name", "issuer", "date", "description"])
+    }
+
+    def __init__(self):
+        self.postings = {}  # trigram -> set of entry keys
+        self.entries = {}   # entry key -> (collection, record, text)
+        self.keys = {}      # id(record) -> entry key
+        self.next_key = 0
+        self.lock = threading.Lock()
+
+    def record_text(self, collection, record):
+        fields = self.collections[collection][1]
+        return "\n".join(str(record.get(field, "")).lower() for field in fields)
+
+    def trigrams(self, text):
+        # Padding gives every position a trigram, so 1-2 character queries are trigram prefixes
+        padded = text + "\0\0"
+        return {padded[i:i + 3] for i in range(len(text))}
+
+    def rebuild(self, transactions, documents):
+        with self.lock:
+            self.postings = {}
+            self.entries = {}
+            self.keys = {}
+            self.next_key = 0
+        for trans in transactions:
+            self.add("transactions", trans)
+        for doc_type, docs in documents.items():
+            for doc in docs:
+                self.add(doc_type, doc)
+
+    def add(self, collection, record, key=None):
+        if collection not in self.collections:
+            return
+        text = self.record_text(collection, record)
+        with self.lock:
+            if key is None:
+                key = self.next_key
+                self.next_key += 1
+            self.entries[key] = (collection, record, text)
+            self.keys[id(record)] = key
+            for gram in self.trigrams(text):
+                self.postings.setdefault(gram, set()).add(key)
+
+    def remove(self, collection, record):
+        """Drop a record from the index and return its entry key"""
+        with self.lock:
+            key = self.keys.pop(id(record), None)
+            if key is None:
+                return None
+            text = self.entries.pop(key)[2]
+            for gram in self.trigrams(text):
+                keys = self.postings.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.postings[gram]
+            return key
+
+    def replace(self, collection, old_record, new_record):
+        # Reusing the entry key keeps an edited record in its original result position
+        key = self.remove(collection, old_record)
+        self.add(collection, new_record, key)
+
+    def search(self, query):
+        """Return {category: [(collection, record), ...]} in insertion order"""
+        return dict(self.iter_search(query))
+
+    def estimate(self, query):
+        """Upper bound on the records matching query from its rarest trigram; None if too short to tell"""
+        if len(query) < 3:
+            return None
+        query = query.lower()
+        with self.lock:
+            return min(len(self.postings.get(query[i:i + 3], ())) for i in range(len(query) - 2))
+
+    def records(self, query, collection):
+        """Records of one collection whose searchable fields contain query"""
+        category = self.collections[collection][0]
+        return [record for _, record in self.search(query).get(category, [])]
+
+    def iter_search(self, query, is_cancelled=None):
+        """Yield (category, [(collection, record), ...]) one category at a time"""
+        query = query.lower()
+        with self.lock:
+            if len(query) < 3:
+                keys = set()
+                for gram, gram_keys in self.postings.items():
+                    if gram.startswith(query):
+                        keys |= gram_keys
+            else:
+                grams = sorted((self.postings.get(query[i:i + 3], set()) for i in range(len(query) - 2)), key=len)
+                keys = set(grams[0])
+                for gram_keys in grams[1:]:
+                    keys &= gram_keys
+                    if not keys:
+                        break
+            by_collection = {}
+            for key in keys:
+                by_collection.setdefault(self.entries[key][0], []).append(key)
+
+        for collection, (category, fields) in self.collections.items():
+            if is_cancelled is not None and is_cancelled():
+                return
+            matches = []
+            with self.lock:
+                for key in sorted(by_collection.get(collection, [])):
+                    entry = self.entries.get(key)
+                    # Trigram hits only prove each trigram occurs, so longer queries are verified
+                    if entry is not None and (len(query) < 3 or query in entry[2]):
+                        matches.append((collection, entry[1]))
+            yield category, matches
+
+class SearchSignals(QObject):
+    category_found = pyqtSignal(int, str, list)
+    finished = pyqtSignal(int)
+
+class SearchTask(QRunnable):
+    """Runs one global search off the GUI thread, streaming results per category"""
+
+    def __init__(self, app, query, generation):
+        super().__init__()
+        self.app = app
+        self.query = query
+        self.generation = generation
+        self.signals = SearchSignals()
+        self.setAutoDelete(False)
+
+    def is_cancelled(self):
+        # A newer keystroke bumps the generation and makes this search stale
+        return self.generation != self.app.search_generation
+
+    def run(self):
+        try:
+            for category, matches in self.app.search_index.iter_search(self.query, self.is_cancelled):
+                if matches:
+                    items = [(record.get("_id"), self.app.format_search_result(collection, record))
+                             for collection, record in matches]
+                    self.signals.category_found.emit(self.generation, category, items)
+        finally:
+            # The app holds on to the task until this arrives
+            self.signals.finished.emit(self.generation)
+
+class IconCache:
+    """Icons and painted fallback pixmaps shared by the whole app, decoded once per name and colour"""
+
+    def __init__(self, icon_dir='icons'):
+        self.icon_dir = icon_dir
+        self.icons = {}
+        self.pixmaps = {}
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.icon_dir, name))
+
+    def icon(self, name):
+        icon = self.icons.get(name)
+        if icon is None:
+            icon = self.icons[name] = QIcon(os.path.join(self.icon_dir, name))
+        return icon
+
+    def pixmap(self, name, size):
+        key = (name, size)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(os.path.join(self.icon_dir, name))
+            if not pixmap.isNull():
+                pixmap = pixmap.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            self.pixmaps[key] = pixmap
+        return pixmap
+
+    def painted(self, color, shape="circle", size=32):
+        """Fallback icon: a filled circle or square in color"""
+        key = (shape, color, size)
+        icon = self.icons.get(key)
+        if icon is None:
+            pixmap = QPixmap(size, size)
+            if shape == "square":
+                pixmap.fill(QColor(color))
+            else:
+                pixmap.fill(Qt.transparent)
+                painter = QPainter(pixmap)
+                painter.setBrush(QColor(color))
+                painter.setPen(Qt.NoPen)
+                painter.drawEllipse(2, 2, size - 4, size - 4)
+                painter.end()
+            icon = self.icons[key] = QIcon(pixmap)
+        return icon
+
+class ThumbnailSignals(QObject):
+    ready = pyqtSignal(str, str, QImage)
+    failed = pyqtSignal(str, str)
+
+def thumbnail_key(path):
+    """Cache key of an image: the sha256 of its content"""
+    # Blob store names already are the sha256 of the content
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if len(stem) == 64 and all(c in "0123456789abcdef" for c in stem):
+        return stem
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ThumbnailTask(QRunnable):
+    """Produces the thumbnail of one image, from the disk cache or by a downscaled decode"""
+
+    def __init__(self, path, size, cache_dir):
+        super().__init__()
+        self.path = path
+        self.size = size
+        self.cache_dir = cache_dir
+        self.signals = ThumbnailSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            key = thumbnail_key(self.path)
+            cached_file = os.path.join(self.cache_dir, f"{key}_{self.size}.png")
+            image = QImage(cached_file) if os.path.exists(cached_file) else QImage()
+            if image.isNull():
+                reader = QImageReader(self.path)
+                reader.setAutoTransform(True)
+                if reader.size().isValid():
+                    # Let the decoder scale (JPEG decodes at 1/2, 1/4, 1/8 directly)
+                    reader.setScaledSize(reader.size().scaled(self.size, self.size, Qt.KeepAspectRatio))
+                image = reader.read()
+                if image.isNull():
+                    raise ValueError(reader.errorString())
+                # A temp file of its own, as two tasks may render the same content at once
+                handle, temp_file = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+                os.close(handle)
+                try:
+                    image.save(temp_file, "PNG")
+                    os.replace(temp_file, cached_file)
+                except OSError:
+                    os.remove(temp_file)
+                    raise
+            self.signals.ready.emit(self.path, key, image)
+        except Exception as e:
+            self.signals.failed.emit(self.path, str(e))
+
+class ThumbnailCache(QObject):
+    """Thumbnails of document images: an LRU of pixmaps in memory over PNGs in data/thumbnails"""
+
+    def __init__(self, cache_dir, size=160, capacity=256, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self.size = size
+        self.capacity = capacity
+        self.pixmaps = OrderedDict()
+        self.keys = {}
+        self.missing = set()
+        self.waiting = {}
+        self.tasks = {}
+        # A small pool of its own so a long list cannot starve logins and searches
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def request(self, path, callback):
+        """Call callback(pixmap) with the thumbnail of path (None if it cannot be read), right away when cached"""
+        if path in self.missing:
+            callback(None)
+            return
+        key = self.keys.get(path)
+        if key in self.pixmaps:
+            self.pixmaps.move_to_end(key)
+            callback(self.pixmaps[key])
+            return
+        self.waiting.setdefault(path, []).append(callback)
+        if path in self.tasks:
+            return
+        task = ThumbnailTask(path, self.size, self.cache_dir)
+        task.signals.ready.connect(self.on_ready)
+        task.signals.failed.connect(self.on_failed)
+        self.tasks[path] = task
+        self.pool.start(task)
+
+    def on_ready(self, path, key, image):
+        self.tasks.pop(path, None)
+        self.keys[path] = key
+        pixmap = self.pixmaps.get(key)
+        if pixmap is None:
+            pixmap = QPixmap.fromImage(image)
+            self.pixmaps[key] = pixmap
+            while len(self.pixmaps) > self.capacity:
+                self.pixmaps.popitem(last=False)
+        for callback in self.waiting.pop(path, []):
+            callback(pixmap)
+
+    def on_failed(self, path, error):
+        self.tasks.pop(path, None)
+        self.missing.add(path)
+        print(f"No thumbnail for {path}: {error}")
+        for callback in self.waiting.pop(path, []):
+            callback(None)
+
+    def forget(self, path):
+        """Try path again on the next request, e.g. once its image has been copied in"""
+        self.missing.discard(path)
+        self.keys.pop(path, None)
+
+    def collect_garbage(self, paths):
+        """Delete cached thumbnails of images other than paths, and stale temp files; returns the count"""
+        keys = {thumbnail_key(path) for path in paths if os.path.exists(path)}
+        removed = 0
+        expiry = time.time() - 86400
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith('.tmp'):
+                # Temp files younger than a day may belong to a render in progress
+                stale = os.path.getmtime(path) < expiry
+            else:
+                stale = name.rsplit('_', 1)[0] not in keys
+            if stale:
+                os.remove(path)
+                removed += 1
+        return removed
+
+class TransactionTableModel(QAbstractTableModel):
+    """Table model for the Transactions sub-tab; rows are fetched lazily a page at a time
+
+    Showing everything, the model reads the app's transaction list in place, newest first,
+    so opening the view costs one page however long the history is. Filter and search
+    results are a list of their own, shown in the order given.
+    """
+
+    headers = ["Date", "Type", "Category", "Amount", "Description", "Actions", "Edit"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        settings = QSettings("FinanceDocManager", "AppSettings")
+        self.page_size = max(int(settings.value("transactions_page_size", 200)), 1)
+        self.rows = []
+        self.loaded = 0
+        self.showing_all = True
+
+    def record(self, row):
+        if self.showing_all:
+            return self.rows[len(self.rows) - 1 - row]
+        return self.rows[row]
+
+    def record_id(self, row):
+        return self.record(row).get("_id")
+
+    def model_row(self, index):
+        """Table row of position index in the app's transaction list, when showing everything"""
+        return len(self.rows) - 1 - index
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        transaction = self.record(index.row())
+        column = index.column()
+        if column == 0:
+            return transaction["date"]
+        elif column == 1:
+            return transaction["type"]
+        elif column == 2:
+            return transaction["category"]
+        elif column == 3:
+            return f"₹{transaction['amount']:.2f}"
+        elif column == 4:
+            return transaction["description"]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(self.page_size, len(self.rows) - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def ensure_loaded(self, row):
+        while self.loaded <= row and self.canFetchMore():
+            self.fetchMore()
+
+    def show_all(self, transactions):
+        """Show the app's own list, newest first; the list is read in place, not copied"""
+        self.beginResetModel()
+        self.rows = transactions
+        self.loaded = min(self.page_size, len(self.rows))
+        self.showing_all = True
+        self.endResetModel()
+
+    def set_transactions(self, transactions):
+        self.beginResetModel()
+        self.rows = list(transactions)
+        self.loaded = min(self.page_size, len(self.rows))
+        self.showing_all = False
+        self.endResetModel()
+
+    def transactions_appended(self):
+        # Restored batches land at the top of the newest-first view; show the first page again
+        self.beginResetModel()
+        self.loaded = min(self.page_size, len(self.rows))
+        self.endResetModel()
+
+    # Adds and removals change the app's list here, between the begin/end notifications
+
+    def add_transaction(self, transactions, transaction):
+        if not self.showing_all:
+            # The filtered view is re-run by the caller
+            transactions.append(transaction)
+            return
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        transactions.append(transaction)
+        self.loaded += 1
+        self.endInsertRows()
+
+    def remove_transaction(self, row, transactions, index):
+        """Pop transactions[index], shown at row, and return it"""
+        if row >= self.loaded:
+            if not self.showing_all:
+                del self.rows[row]
+            return transactions.pop(index)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        transaction = transactions.pop(index)
+        if not self.showing_all:
+            del self.rows[row]
+        self.loaded -= 1
+        self.endRemoveRows()
+        return transaction
+
+    def transaction_updated(self, index):
+        # Follows a change the app already made to its list
+        row = self.model_row(index)
+        if row < self.loaded:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1))
+
+class ActionButtonDelegate(QStyledItemDelegate):
+    """Paints a push button in a table cell instead of creating a widget per row"""
+
+    clicked = pyqtSignal(int)
+
+    def __init__(self, text, color, parent=None):
+        super().__init__(parent)
+        self.text = text
+        self.color = color
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(4, 4, -4, -4)
+        button.text = self.text
+        button.state = QStyle.State_Enabled | (option.state & QStyle.State_MouseOver)
+        button.palette = option.palette
+        button.palette.setColor(QPalette.ButtonText, QColor(self.color))
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, button, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton \
+                and option.rect.contains(event.pos()):
+            self.clicked.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
+
+def date_key(text):
+    """yyyy-MM-dd as the integer yyyymmdd, so date ranges compare as plain numbers; 0 if malformed"""
+    try:
+        return int(text[:4]) * 10000 + int(text[5:7]) * 100 + int(text[8:10])
+    except (TypeError, ValueError):
+        return 0
+
+@lru_cache(maxsize=None)
+def load_numpy():
+    """NumPy if it is installed and the finance engine setting allows it ("numpy" or "python")"""
+    settings = QSettings("FinanceDocManager", "AppSettings")
+    engine = os.environ.get("FINANCEDOC_FINANCE_ENGINE") or settings.value("finance_engine", "numpy")
+    if engine != "numpy":
+        return None
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+class TransactionColumns:
+    """Transactions held column-wise in typed arrays; row i is self.transactions[i]
+
+    Filters and totals scan these arrays instead of the record dicts. Type, category and
+    date strings are interned through the column dictionaries, so the records share them too.
+    With NumPy available, larger scans run vectorized over the same buffers.
+
+    by_date lists the rows in date order next to their dates in by_date_keys, so a date
+    range is two binary searches and a slice rather than a pass over every row. Full sort
+    orders (which also serve amount ranges) are cached in orders until the next change.
+    """
+
+    # Below this many rows the plain loops beat the cost of setting up the arrays
+    numpy_min_rows = 2048
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.dates = array('i')
+        self.amounts = array('d')
+        self.types = array('H')
+        self.categories = array('I')
+        self.type_names = []
+        self.type_codes = {}
+        self.category_names = []
+        self.category_codes = {}
+        self.date_keys = {}
+        self.by_date = array('i')
+        self.by_date_keys = array('i')
+        self.by_date_stale = False
+        self.orders = {}
+        self.amount_keys = None
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def engine(self):
+        return load_numpy() if len(self) >= self.numpy_min_rows else None
+
+    def view(self, numpy, column):
+        # Zero-copy; the view must not outlive the call, an exported array cannot grow
+        return numpy.frombuffer(column, dtype=column.typecode)
+
+    def rebuild(self, transactions):
+        self.clear()
+        self.extend(transactions)
+
+    def code(self, names, codes, name):
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+    def encode(self, trans):
+        type_code = self.code(self.type_names, self.type_codes, trans["type"])
+        category_code = self.code(self.category_names, self.category_codes, trans["category"])
+        date = trans["date"]
+        entry = self.date_keys.get(date)
+        if entry is None:
+            entry = self.date_keys[date] = (date_key(date), date)
+        key, trans["date"] = entry
+        trans["type"] = self.type_names[type_code]
+        trans["category"] = self.category_names[category_code]
+        return key, float(trans["amount"]), type_code, category_code
+
+    def extend(self, transactions):
+        # Bulk loads arrive in any date order; sort once on the next query instead of per row
+        self.by_date_stale = True
+        for trans in transactions:
+            self.append(trans)
+
+    def append(self, trans):
+        key, amount, type_code, category_code = self.encode(trans)
+        self.dates.append(key)
+        self.amounts.append(amount)
+        self.types.append(type_code)
+        self.categories.append(category_code)
+        if not self.by_date_stale:
+            self.insert_by_date(len(self) - 1, key)
+        if self.orders:
+            self.drop_orders()
+
+    def update(self, row, trans):
+        old_key = self.dates[row]
+        self.dates[row], self.amounts[row], self.types[row], self.categories[row] = self.encode(trans)
+        if not self.by_date_stale and self.dates[row] != old_key:
+            self.remove_by_date(row, old_key)
+            self.insert_by_date(row, self.dates[row])
+        self.drop_orders()
+
+    def delete(self, row):
+        key = self.dates[row]
+        del self.dates[row]
+        del self.amounts[row]
+        del self.types[row]
+        del self.categories[row]
+        if not self.by_date_stale:
+            self.remove_by_date(row, key)
+            # Every row after the deleted one moved up by one
+            numpy = self.engine()
+            if numpy is not None:
+                rows = self.view(numpy, self.by_date)
+                rows -= rows > row
+                del rows
+            else:
+                self.by_date = array('i', [other - (other > row) for other in self.by_date])
+        self.drop_orders()
+
+    def drop_orders(self):
+        self.orders = {}
+        self.amount_keys = None
+
+    def insert_by_date(self, row, key):
+        # New transactions are mostly the latest, so this is usually an append
+        position = bisect_right(self.by_date_keys, key)
+        self.by_date_keys.insert(position, key)
+        self.by_date.insert(position, row)
+
+    def remove_by_date(self, row, key):
+        for position in range(bisect_left(self.by_date_keys, key), bisect_right(self.by_date_keys, key)):
+            if self.by_date[position] == row:
+                del self.by_date[position]
+                del self.by_date_keys[position]
+                return
+
+    def sort_by_date(self):
+        numpy = self.engine()
+        if numpy is not None:
+            order = numpy.argsort(self.view(numpy, self.dates), kind="stable").astype(self.by_date.typecode)
+            self.by_date = array('i', order.tobytes())
+            self.by_date_keys = array('i', self.view(numpy, self.dates)[order].tobytes())
+        else:
+            self.by_date = array('i', sorted(range(len(self)), key=self.dates.__getitem__))
+            self.by_date_keys = array('i', map(self.dates.__getitem__, self.by_date))
+        self.by_date_stale = False
+
+    def date_range(self, lowest, highest):
+        """by_date slice bounds holding the rows dated lowest..highest"""
+        if self.by_date_stale:
+            self.sort_by_date()
+        return bisect_left(self.by_date_keys, lowest), bisect_right(self.by_date_keys, highest)
+
+    def date_rows(self, start, stop):
+        """The rows of a by_date slice, back in row order"""
+        if start == 0 and stop == len(self):
+            return list(range(len(self)))
+        numpy = self.engine()
+        if numpy is not None:
+            return numpy.sort(self.view(numpy, self.by_date)[start:stop]).tolist()
+        return sorted(self.by_date[start:stop])
+
+    def amount_range(self, amount_from=None, amount_to=None):
+        """Slice bounds of the rows with amount_from <= amount <= amount_to in the "Amount" order"""
+        order = self.order("Amount")
+        if self.amount_keys is None:
+            self.amount_keys = array('d', map(self.amounts.__getitem__, order))
+        start = bisect_left(self.amount_keys, amount_from) if amount_from is not None else 0
+        stop = bisect_right(self.amount_keys, amount_to) if amount_to is not None else len(order)
+        return start, stop
+
+    def amount_rows(self, start, stop):
+        return sorted(self.order("Amount")[start:stop])
+
+    def select(self, trans_type=None, category=None, date_from=None, date_to=None,
+               amount_from=None, amount_to=None):
+        """Row numbers matching every given condition, in row order"""
+        lowest = date_key(date_from) if date_from else 0
+        highest = date_key(date_to) if date_to else 99999999
+        type_code = self.type_codes.get(trans_type)
+        category_code = self.category_codes.get(category)
+        if (trans_type is not None and type_code is None) or (category is not None and category_code is None):
+            return []
+        start, stop = self.date_range(lowest, highest)
+        everything = start == 0 and stop == len(self)
+        numpy = self.engine()
+        if numpy is not None:
+            if everything:
+                rows = numpy.arange(len(self))
+            else:
+                rows = numpy.sort(self.view(numpy, self.by_date)[start:stop])
+            if trans_type is not None:
+                rows = rows[self.view(numpy, self.types)[rows] == type_code]
+            if category is not None:
+                rows = rows[self.view(numpy, self.categories)[rows] == category_code]
+            if amount_from is not None:
+                rows = rows[self.view(numpy, self.amounts)[rows] >= amount_from]
+            if amount_to is not None:
+                rows = rows[self.view(numpy, self.amounts)[rows] <= amount_to]
+            return rows.tolist()
+        rows = list(range(len(self))) if everything else sorted(self.by_date[start:stop])
+        if trans_type is not None:
+            types = self.types
+            rows = [row for row in rows if types[row] == type_code]
+        if category is not None:
+            categories = self.categories
+            rows = [row for row in rows if categories[row] == category_code]
+        amounts = self.amounts
+        if amount_from is not None:
+            rows = [row for row in rows if amounts[row] >= amount_from]
+        if amount_to is not None:
+            rows = [row for row in rows if amounts[row] <= amount_to]
+        return rows
+
+    def category_ranks(self, numpy):
+        # Rank each category code by its name so codes compare in name order
+        ranks = numpy.empty(len(self.category_names), dtype=numpy.int64)
+        ranks[sorted(range(len(self.category_names)), key=self.category_names.__getitem__)] = \
+            numpy.arange(len(self.category_names))
+        return ranks
+
+    def sort_keys(self, numpy, sort_by, rows):
+        if sort_by == "Date":
+            return self.view(numpy, self.dates)[rows].astype(numpy.int64)
+        if sort_by == "Amount":
+            return self.view(numpy, self.amounts)[rows]
+        return self.category_ranks(numpy)[self.view(numpy, self.categories)[rows]]
+
+    def sort_key(self, sort_by):
+        if sort_by == "Date":
+            return self.dates.__getitem__
+        if sort_by == "Amount":
+            return self.amounts.__getitem__
+        names, categories = self.category_names, self.categories
+        return lambda row: names[categories[row]]
+
+    def order(self, sort_by, descending=False):
+        """Every row ordered by "Date", "Amount" or "Category", cached until the next change"""
+        order = self.orders.get((sort_by, descending))
+        if order is None:
+            numpy = self.engine()
+            if numpy is not None:
+                keys = self.sort_keys(numpy, sort_by, slice(None))
+                order = numpy.argsort(-keys if descending else keys, kind="stable").astype(self.dates.typecode)
+                order = array('i', order.tobytes())
+            else:
+                order = array('i', sorted(range(len(self)), key=self.sort_key(sort_by), reverse=descending))
+            self.orders[(sort_by, descending)] = order
+        return order
+
+    def sort_rows(self, rows, sort_by, descending=False):
+        """Rows ordered by "Date", "Amount" or "Category"; ties keep their order, as list.sort does"""
+        if sort_by not in ("Date", "Amount", "Category") or not rows:
+            return rows
+        numpy = self.engine()
+        if len(rows) * 8 >= len(self):
+            # A large share of all rows: walk the cached full order rather than sorting them
+            order = self.order(sort_by, descending)
+            if numpy is not None:
+                wanted = numpy.zeros(len(self), dtype=bool)
+                wanted[rows] = True
+                order = self.view(numpy, order)
+                return order[wanted[order]].tolist()
+            wanted = bytearray(len(self))
+            for row in rows:
+                wanted[row] = 1
+            return [row for row in order if wanted[row]]
+        if numpy is not None:
+            rows = numpy.array(rows, dtype=numpy.intp)
+            keys = self.sort_keys(numpy, sort_by, rows)
+            return rows[numpy.argsort(-keys if descending else keys, kind="stable")].tolist()
+        return sorted(rows, key=self.sort_key(sort_by), reverse=descending)
+
+    def group_totals(self):
+        """(sum, count) per (type, category, month) code triple in one pass over the arrays"""
+        numpy = self.engine()
+        if numpy is not None:
+            # One combined integer key per row, then a weighted bincount per distinct key
+            width = len(self.category_names)
+            keys = (self.view(numpy, self.types).astype(numpy.int64) * width
+                    + self.view(numpy, self.categories)) * 1000000 + self.view(numpy, self.dates) // 100
+            distinct, groups = numpy.unique(keys, return_inverse=True)
+            sums = numpy.bincount(groups, weights=self.view(numpy, self.amounts))
+            counts = numpy.bincount(groups)
+            return {(int(key // 1000000 // width), int(key // 1000000 % width), int(key % 1000000)): (total, count)
+                    for key, total, count in zip(distinct.tolist(), sums.tolist(), counts.tolist())}
+        groups = {}
+        for group, amount in zip(zip(self.types, self.categories, (key // 100 for key in self.dates)),
+                                 self.amounts):
+            total = groups.get(group)
+            groups[group] = (amount, 1) if total is None else (total[0] + amount, total[1] + 1)
+        return groups
+
+class TransactionQuery:
+    """An advanced search parsed once; the most selective index drives it and the rest filter its rows"""
+
+    def __init__(self, keyword="", date_from=None, date_to=None, amount_from=None, amount_to=None,
+                 sort_by=None, descending=False):
+        self.keyword = keyword.lower()
+        self.date_from = date_from
+        self.date_to = date_to
+        self.lowest = date_key(date_from) if date_from else 0
+        self.highest = date_key(date_to) if date_to else 99999999
+        # A malformed bound raises ValueError here, before anything is scanned
+        self.amount_from = float(amount_from) if amount_from else None
+        self.amount_to = float(amount_to) if amount_to else None
+        self.sort_by = sort_by
+        self.descending = descending
+
+    def plan(self, columns, search_index):
+        """[(estimated rows, index, slice bounds)] for every usable index, cheapest first"""
+        start, stop = columns.date_range(self.lowest, self.highest)
+        plans = [(stop - start, "date", (start, stop))]
+        if self.amount_from is not None or self.amount_to is not None:
+            start, stop = columns.amount_range(self.amount_from, self.amount_to)
+            plans.append((stop - start, "amount", (start, stop)))
+        estimate = search_index.estimate(self.keyword)
+        if estimate is not None:
+            plans.append((estimate, "keyword", None))
+        return sorted(plans, key=lambda plan: plan[0])
+
+    def run(self, columns, transactions, search_index, row_of):
+        """Matching rows of transactions, sorted as requested; row_of maps a record to its row"""
+        index, bounds = self.plan(columns, search_index)[0][1:]
+        if index == "date":
+            # select covers the amount bounds too, vectorized when NumPy is there
+            rows = columns.select(date_from=self.date_from, date_to=self.date_to,
+                                  amount_from=self.amount_from, amount_to=self.amount_to)
+        else:
+            if index == "amount":
+                rows = columns.amount_rows(*bounds)
+            else:
+                # A record the index still holds may already be gone from the list (row_of gives None)
+                rows = sorted(row for row in map(row_of, search_index.records(self.keyword, "transactions"))
+                              if row is not None)
+            # Residual filters for the conditions the driving index did not apply
+            lowest, highest, dates, amounts = self.lowest, self.highest, columns.dates, columns.amounts
+            rows = [row for row in rows if lowest <= dates[row] <= highest]
+            if index != "amount" and self.amount_from is not None:
+                rows = [row for row in rows if amounts[row] >= self.amount_from]
+            if index != "amount" and self.amount_to is not None:
+                rows = [row for row in rows if amounts[row] <= self.amount_to]
+        if self.keyword:
+            rows = [row for row in rows if self.keyword in transactions[row]["description"].lower()]
+        return columns.sort_rows(rows, self.sort_by, self.descending)
+
+class TransactionAggregates:
+    """Running totals per type, per category and per month, kept up to date on every change"""
+
+    def __init__(self):
+        self.rebuild(TransactionColumns())
+
+    def rebuild(self, columns):
+        self.by_type = {"Income": 0, "Expense": 0}
+        self.by_category = {"Income": {}, "Expense": {}}
+        self.by_month = {"Income": {}, "Expense": {}}
+        # Record counts let empty buckets be dropped instead of drifting around 0.0
+        self.counts = {}
+        for (type_code, category_code, month), (amount, count) in columns.group_totals().items():
+            trans_type = columns.type_names[type_code]
+            category = columns.category_names[category_code]
+            month = self.month_key(month)
+            self.by_category.setdefault(trans_type, {})
+            self.by_month.setdefault(trans_type, {})
+            self.bump(self.by_type, trans_type, amount, ("type", trans_type), count)
+            self.bump(self.by_category[trans_type], category, amount,
+                      ("category", trans_type, category), count)
+            self.bump(self.by_month[trans_type], month, amount, ("month", trans_type, month), count)
+
+    @staticmethod
+    def month_key(month):
+        """yyyymm as "yyyy-MM"; malformed dates (month 0) all land in "0000-00", loaded or added live"""
+        return f"{month // 100:04d}-{month % 100:02d}"
+
+    def bump(self, totals, key, amount, count_key, delta):
+        count = self.counts.get(count_key, 0) + delta
+        if count <= 0:
+            self.counts.pop(count_key, None)
+            totals.pop(key, None)
+        else:
+            self.counts[count_key] = count
+            totals[key] = totals.get(key, 0) + amount
+
+    def apply(self, trans, sign):
+        trans_type = trans["type"]
+        amount = sign * trans["amount"]
+        self.by_category.setdefault(trans_type, {})
+        self.by_month.setdefault(trans_type, {})
+        self.bump(self.by_type, trans_type, amount, ("type", trans_type), sign)
+        self.by_type.setdefault("Income", 0)
+        self.by_type.setdefault("Expense", 0)
+        self.bump(self.by_category[trans_type], trans["category"], amount,
+                  ("category", trans_type, trans["category"]), sign)
+        month = self.month_key(date_key(trans["date"]) // 100)
+        self.bump(self.by_month[trans_type], month, amount, ("month", trans_type, month), sign)
+
+    def add(self, trans):
+        self.apply(trans, 1)
+
+    def remove(self, trans):
+        self.apply(trans, -1)
+
+    def replace(self, old_trans, new_trans):
+        self.remove(old_trans)
+        self.add(new_trans)
+
+def load_charting():
+    """Import matplotlib on first use, it is the slowest import of the app"""
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+    return plt, FigureCanvas
 
 class DocumentManagerApp(QMainWindow):
 
@@ -136,6 +2422,11 @@ class DocumentManagerApp(QMainWindow):
         self.setGeometry(100, 100, 1600, 1000)  # Set a fixed height of 980
         self.setFixedHeight(1000)  # Ensure the height is fixed
 
+        # Startup breakdown, printed with --debug-startup or FINANCEDOC_DEBUG_STARTUP=1
+        self.debug_startup = "--debug-startup" in sys.argv or os.environ.get("FINANCEDOC_DEBUG_STARTUP") == "1"
+        self.startup_timings = [("module imports", IMPORTS_FINISHED - STARTUP_STARTED)]
+        started = time.perf_counter()
+
         # Modern color palette
         self.primary_color = "#2c3e50"
         self.secondary_color = "#3498db"
@@ -146,8 +2437,13 @@ class DocumentManagerApp(QMainWindow):
         # Set application-wide style
         self.setStyleSheet(self.get_stylesheet())
 
+        # Tasks currently running on the thread pool
+        self.background_tasks = set()
+
         # Set application icon
+        self.icons = IconCache()
         self.set_application_icon()
+        started = self.time_startup_step("stylesheet and icon", started)
 
         # Initialize data
         self.transactions = []
@@ -168,9 +2464,37 @@ class DocumentManagerApp(QMainWindow):
         self.documents_dir = os.path.join(self.data_dir, "documents")
         os.makedirs(self.documents_dir, exist_ok=True)
 
+        # Mutations go to the storage backend one record at a time (journal or SQLite)
+        self.storage = create_storage(self.data_dir)
+        self.revision = 0
+        self.next_record_id = 1
+        self.blob_store = BlobStore(self.documents_dir)
+        self.thumbnails = ThumbnailCache(os.path.join(self.data_dir, "thumbnails"), parent=self)
+        self.pending_image_copies = 0
+        self.search_index = SearchIndex()
+        self.record_index = RecordIndex()
+        # Column copy of self.transactions that filters and totals scan
+        self.trans_columns = TransactionColumns()
+        self.aggregates = TransactionAggregates()
+        self.compaction_timer = QTimer(self)
+        self.compaction_timer.timeout.connect(self.compact_journal)
+        self.compaction_timer.start(60000)
+        # Mutations are buffered by the storage and flushed together once a burst goes quiet,
+        # or at the latest save_interval_ms after the first one
+        settings = QSettings("FinanceDocManager", "AppSettings")
+        self.save_interval = int(os.environ.get("FINANCEDOC_SAVE_INTERVAL_MS")
+                                 or settings.value("save_interval_ms", 2000))
+        self.dirty_since = None
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.timeout.connect(self.flush_storage)
+        started = self.time_startup_step("open storage", started)
+
         self.load_data()
+        started = self.time_startup_step("load data", started)
         self.init_ui()
         self.update_balance()
+        self.time_startup_step("login form and menus", started)
 
         # Add some visual polish
         self.setWindowOpacity(0.0)
@@ -232,7 +2556,7 @@ class DocumentManagerApp(QMainWindow):
             }}
 
             /* Input Fields */
-            QLineEdit, QTextEdit, QComboBox, QDateEdit, QListWidget, QTableWidget {{
+            QLineEdit, QTextEdit, QComboBox, QDateEdit, QListWidget, QTableView {{
                 padding: 10px;
                 border: 1px solid #d6d6d6;
                 border-radius: 6px;
@@ -255,7 +2579,7 @@ class DocumentManagerApp(QMainWindow):
             }}
 
             /* Tables */
-            QTableWidget {{
+            QTableView {{
                 border: 1px solid #d6d6d6;
                 border-radius: 6px;
                 gridline-color: #e0e0e0;
@@ -269,7 +2593,7 @@ class DocumentManagerApp(QMainWindow):
                 font-weight: bold;
                 border-radius: 4px;
             }}
-            QTableWidget::item {{
+            QTableView::item {{
                 padding: 8px;
             }}
 
@@ -455,33 +2779,77 @@ class DocumentManagerApp(QMainWindow):
             }}
         """
 
+    def run_in_background(self, fn, *args, on_finished=None, on_failed=None):
+        task = BackgroundTask(fn, *args)
+        # Keep a reference until the task reports back so its signals stay alive
+        self.background_tasks.add(task)
+        task.signals.finished.connect(lambda result: self.background_tasks.discard(task))
+        task.signals.failed.connect(lambda error: self.background_tasks.discard(task))
+        if on_finished is not None:
+            task.signals.finished.connect(on_finished)
+        task.signals.failed.connect(on_failed or self.show_background_error)
+        QThreadPool.globalInstance().start(task)
+        return task
+
+    def run_with_progress(self, label, fn, *args, on_step=None, on_finished=None, on_failed=None):
+        """Run a (percent, payload) generator on the thread pool behind a cancellable progress dialog"""
+        dialog = QProgressDialog(label, "Cancel", 0, 100, self)
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(500)
+        task = StreamTask(fn, *args)
+        dialog.canceled.connect(task.cancel)
+        self.background_tasks.add(task)
+
+        def step(item):
+            percent, payload = item
+            dialog.setValue(min(percent, 99))
+            if payload is not None and on_step is not None:
+                on_step(payload)
+
+        def done():
+            self.background_tasks.discard(task)
+            dialog.reset()
+            dialog.deleteLater()
+
+        task.signals.step.connect(step)
+        task.signals.finished.connect(done)
+        task.signals.failed.connect(done)
+        if on_finished is not None:
+            task.signals.finished.connect(on_finished)
+        task.signals.failed.connect(on_failed or self.show_background_error)
+        QThreadPool.globalInstance().start(task)
+        return task
+
+    def show_background_error(self, error):
+        QMessageBox.critical(self, "Error", f"An unexpected error occurred: {error}")
+
     def set_application_icon(self):
-        if os.path.exists('icons/app_icon.png'):
-            self.setWindowIcon(QIcon('icons/app_icon.png'))
+        if self.icons.exists('app_icon.png'):
+            self.setWindowIcon(self.icons.icon('app_icon.png'))
         else:
             # Create a simple default icon if none exists
-            pixmap = QPixmap(32, 32)
-            pixmap.fill(QColor(self.secondary_color))
-            self.setWindowIcon(QIcon(pixmap))
+            self.setWindowIcon(self.icons.painted(self.secondary_color, shape="square"))
 
     def load_icon(self, icon_name, default_color=None):
         """Load an icon with fallback to a colored circle if not found"""
-        icon_path = f'icons/{icon_name}'
-        if os.path.exists(icon_path):
-            return QIcon(icon_path)
+        if self.icons.exists(icon_name):
+            return self.icons.icon(icon_name)
         else:
             # Create a simple colored circle as fallback
-            pixmap = QPixmap(32, 32)
-            pixmap.fill(Qt.transparent)
-            painter = QPainter(pixmap)
-            if default_color:
-                painter.setBrush(QColor(default_color))
-            else:
-                painter.setBrush(QColor(self.secondary_color))
-            painter.setPen(Qt.NoPen)
-            painter.drawEllipse(2, 2, 28, 28)
-            painter.end()
-            return QIcon(pixmap)
+            return self.icons.painted(default_color or self.secondary_color)
+
+    def time_startup_step(self, label, started):
+        now = time.perf_counter()
+        self.startup_timings.append((label, now - started))
+        return now
+
+    def report_startup_timings(self):
+        if not self.debug_startup:
+            return
+        self.startup_timings.append(("total until shown", time.perf_counter() - STARTUP_STARTED))
+        print("Startup time breakdown:")
+        for label, seconds in self.startup_timings:
+            print(f"  {label:<24} {seconds * 1000:8.1f} ms")
 
     def fade_in(self):
         self.fade_timer = QTimer(self)
@@ -499,6 +2867,19 @@ class DocumentManagerApp(QMainWindow):
         # Initialize filter_category to avoid AttributeError
         self.filter_category = QComboBox()
 
+        # Tab pages are built on first activation; until then their widgets stay None
+        self.lazy_tabs = {}
+        # The model follows self.transactions from the start, so adds made before the table is built line up
+        self.trans_model = TransactionTableModel(self)
+        self.trans_model.show_all(self.transactions)
+        self.trans_table = None
+        self.income_label = None
+        self.aadhar_list = None
+        self.pan_list = None
+        self.bank_list = None
+        self.dl_list = None
+        self.cert_list = None
+
         # Create main tab widget
         self.tabs = QTabWidget()
         self.tabs.setDocumentMode(True)  # Modern tab look
@@ -506,10 +2887,11 @@ class DocumentManagerApp(QMainWindow):
         self.tabs.setMovable(False)
 
         # Finance Section
-        self.init_finance_tab()
+        self.add_lazy_tab(self.tabs, self.init_finance_tab, "Finance", 'finance.png')
 
         # Document Management Section
-        self.init_documents_tab()
+        self.add_lazy_tab(self.tabs, self.init_documents_tab, "Documents", 'documents.png')
+        self.tabs.currentChanged.connect(lambda index: self.build_lazy_tab(self.tabs.widget(index)))
 
         # Main layout
         main_widget = QWidget()
@@ -551,6 +2933,29 @@ class DocumentManagerApp(QMainWindow):
         # Check for remembered user
         self.check_remembered_user()
 
+    def add_lazy_tab(self, tab_widget, builder, label, icon=None):
+        """Add an empty page that builder(page) fills in the first time it is shown"""
+        tab = QWidget()
+        self.lazy_tabs[tab] = (builder, label)
+        if icon:
+            tab_widget.addTab(tab, self.icons.icon(icon), label)
+        else:
+            tab_widget.addTab(tab, label)
+        return tab
+
+    def build_lazy_tab(self, tab):
+        if tab not in self.lazy_tabs:
+            return
+        builder, label = self.lazy_tabs.pop(tab)
+        started = time.perf_counter()
+        builder(tab)
+        if self.debug_startup:
+            print(f"Built {label} tab in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def show_tab(self, tab_widget, index):
+        self.build_lazy_tab(tab_widget.widget(index))
+        tab_widget.setCurrentIndex(index)
+
     def create_header(self):
         header = QWidget()
         header.setStyleSheet(f"background-color: {self.primary_color}; border-radius: 8px;")
@@ -582,9 +2987,19 @@ class DocumentManagerApp(QMainWindow):
 
         self.search_bar = QLineEdit()
         self.search_bar.setPlaceholderText("Search transactions and documents...")
-        self.search_bar.textChanged.connect(self.perform_search)
+        self.search_bar.textChanged.connect(self.schedule_search)
         search_bar_layout.addWidget(self.search_bar)
 
+        # Keystrokes are debounced and each search runs on a worker thread
+        self.search_generation = 0
+        # Stale searches keep running until they notice; their tasks are kept alive until finished
+        self.search_tasks = set()
+        self.search_popup = None
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.start_search)
+
         self.advanced_search_button = QPushButton("Advanced Search")
         self.advanced_search_button.setStyleSheet("""
             QPushButton {
@@ -666,7 +3081,7 @@ class DocumentManagerApp(QMainWindow):
         form_layout.addRow("Sort Order:", self.search_sort_order)
 
         btn_search = QPushButton("Search")
-        btn_search.setIcon(QIcon('icons/search.png'))
+        btn_search.setIcon(self.icons.icon('search.png'))
         btn_search.clicked.connect(lambda: self.perform_advanced_search(dialog))
         form_layout.addRow(btn_search)
 
@@ -675,35 +3090,71 @@ class DocumentManagerApp(QMainWindow):
         dialog.exec_()
 
     def perform_advanced_search(self, dialog):
-        keyword = self.search_keyword.text().lower()
-        date_from = self.search_date_from.date().toString(Qt.ISODate)
-        date_to = self.search_date_to.date().toString(Qt.ISODate)
-        amount_from = self.search_amount_from.text()
-        amount_to = self.search_amount_to.text()
-        sort_by = self.search_sort_by.currentText()
-        sort_order = self.search_sort_order.currentText()
-
-        filtered_transactions = []
-        for trans in self.transactions:
-            if (keyword in trans["description"].lower() or not keyword) and \
-               (date_from <= trans["date"] <= date_to) and \
-               (not amount_from or float(amount_from) <= trans["amount"]) and \
-               (not amount_to or float(amount_to) >= trans["amount"]):
-                filtered_transactions.append(trans)
+        try:
+            query = TransactionQuery(
+                keyword=self.search_keyword.text(),
+                date_from=self.search_date_from.date().toString(Qt.ISODate),
+                date_to=self.search_date_to.date().toString(Qt.ISODate),
+                amount_from=self.search_amount_from.text(),
+                amount_to=self.search_amount_to.text(),
+                sort_by=self.search_sort_by.currentText(),
+                descending=self.search_sort_order.currentText() == "Descending")
+        except ValueError:
+            QMessageBox.warning(self, "Error", "Invalid amount format.")
+            return
 
-        if sort_by == "Date":
-            filtered_transactions.sort(key=lambda x: x["date"], reverse=(sort_order == "Descending"))
-        elif sort_by == "Amount":
-            filtered_transactions.sort(key=lambda x: x["amount"], reverse=(sort_order == "Descending"))
-        elif sort_by == "Category":
-            filtered_transactions.sort(key=lambda x: x["category"], reverse=(sort_order == "Descending"))
+        if self.storage.supports_queries:
+            filtered_transactions = self.storage.query_transactions(
+                date_from=query.date_from, date_to=query.date_to, keyword=query.keyword,
+                amount_from=query.amount_from, amount_to=query.amount_to,
+                sort_by=query.sort_by, descending=query.descending)
+            self.load_transactions(filtered_transactions)
+            dialog.accept()
+            return
 
-        self.load_transactions(filtered_transactions)
+        rows = query.run(self.trans_columns, self.transactions, self.search_index,
+                         lambda record: self.record_index.row("transactions", self.transactions, record["_id"]))
+        self.load_transactions([self.transactions[row] for row in rows])
 
         dialog.accept()
 
-    def show_search_results_popup(self, query, results):
-        # Create a frame to act as a popup
+    def schedule_search(self, query):
+        # Invalidate any search still running for an older query
+        self.search_generation += 1
+        if not query:
+            self.search_timer.stop()
+            if self.search_popup is not None:
+                self.search_popup.hide()
+            self.perform_search(query)
+            return
+        self.search_timer.start()
+
+    def start_search(self):
+        query = self.search_bar.text()
+        if not query:
+            return
+        self.clear_search_results()
+        task = SearchTask(self, query, self.search_generation)
+        self.search_tasks.add(task)
+        task.signals.category_found.connect(self.on_search_category_found)
+        task.signals.finished.connect(self.on_search_finished)
+        task.signals.finished.connect(lambda generation: self.search_tasks.discard(task))
+        QThreadPool.globalInstance().start(task)
+
+    def on_search_category_found(self, generation, category, items):
+        if generation != self.search_generation:
+            return
+        self.add_search_results(category, items)
+        if not self.search_popup.isVisible():
+            self.position_search_popup()
+            self.search_popup.show()
+
+    def on_search_finished(self, generation):
+        if generation == self.search_generation and self.search_results_list.count() == 0:
+            self.search_popup.hide()
+
+    def create_search_popup(self):
+        # Create a frame to act as a popup; it is reused for every search
         popup = QFrame(self)
         popup.setStyleSheet("""
             QFrame {
@@ -729,139 +3180,116 @@ class DocumentManagerApp(QMainWindow):
                 background-color: #f0f0f0;
             }
         """)
-        popup.setWindowFlags(Qt.Popup)
+        # A tool window that never takes focus, so typing continues in the search bar
+        popup.setWindowFlags(Qt.Tool | Qt.FramelessWindowHint | Qt.WindowDoesNotAcceptFocus)
+        popup.setAttribute(Qt.WA_ShowWithoutActivating)
 
-        # Calculate the position of the popup
-        search_bar_global_pos = self.search_bar.mapToGlobal(QPoint(0, 0))
-        popup_x = search_bar_global_pos.x()
-        popup_y = search_bar_global_pos.y() + self.search_bar.height()
-        popup.setGeometry(popup_x, popup_y, 550, 350)
         layout = QVBoxLayout(popup)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
 
         # Create a list widget for search results
-        results_list = QListWidget()
-        results_list.setStyleSheet("""
+        self.search_results_list = QListWidget()
+        self.search_results_list.setStyleSheet("""
             QListWidget::item {
                 padding: 8px;
             }
         """)
 
-        # Populate the list with search results
-        for category, items in results.items():
-            if items:  # Only add categories that have results
-                category_item = QListWidgetItem(category)
-                category_item.setFlags(Qt.NoItemFlags)  # Make category non-selectable
-                category_item.setBackground(QColor("#f0f0f0"))
-                category_item.setForeground(QColor("#3498db"))
-                font = category_item.font()
-                font.setBold(True)
-                category_item.setFont(font)
-                results_list.addItem(category_item)
-                
-                for item in items:
-                    # Store the original data reference in the item
-                    list_item = QListWidgetItem(f"  • {item}")
-                    list_item.setData(Qt.UserRole, (category, item))  # Store category and item data
-                    results_list.addItem(list_item)
-
         # Connect item click to navigation function
-        results_list.itemClicked.connect(lambda item: self.navigate_to_search_result(item))
+        self.search_results_list.itemClicked.connect(lambda item: self.navigate_to_search_result(item))
 
-        layout.addWidget(results_list)
+        layout.addWidget(self.search_results_list)
         popup.setLayout(layout)
-        popup.show()
+        self.search_popup = popup
+
+    def position_search_popup(self):
+        # Calculate the position of the popup
+        search_bar_global_pos = self.search_bar.mapToGlobal(QPoint(0, 0))
+        popup_x = search_bar_global_pos.x()
+        popup_y = search_bar_global_pos.y() + self.search_bar.height()
+        self.search_popup.setGeometry(popup_x, popup_y, 550, 350)
+
+    def clear_search_results(self):
+        if self.search_popup is None:
+            self.create_search_popup()
+        self.search_results_list.clear()
+
+    def add_search_results(self, category, items):
+        if not items:  # Only add categories that have results
+            return
+        category_item = QListWidgetItem(category)
+        category_item.setFlags(Qt.NoItemFlags)  # Make category non-selectable
+        category_item.setBackground(QColor("#f0f0f0"))
+        category_item.setForeground(QColor("#3498db"))
+        font = category_item.font()
+        font.setBold(True)
+        category_item.setFont(font)
+        self.search_results_list.addItem(category_item)
+
+        for record_id, text in items:
+            # The record id lets the click jump straight to the record
+            list_item = QListWidgetItem(f"  • {text}")
+            list_item.setData(Qt.UserRole, (category, record_id))
+            self.search_results_list.addItem(list_item)
+
+    def show_search_results_popup(self, query, results):
+        self.clear_search_results()
+        for category, items in results.items():
+            self.add_search_results(category, items)
+        self.position_search_popup()
+        self.search_popup.show()
 
     def navigate_to_search_result(self, item):
         # Get the stored data from the clicked item
         data = item.data(Qt.UserRole)
         if not data:
             return  # This was a category header
-        
-        category, item_text = data
-        
+
+        collection, record = self.record_index.get(data[1])
+
         # Close the popup
-        self.sender().parent().close()
-        
-        # Navigate to the appropriate tab and select the item
-        if category == "Transactions":
-            self.tabs.setCurrentIndex(0)  # Finance tab
+        self.search_popup.hide()
+        if record is None:
+            return  # Deleted since the search ran
+
+        # Navigate to the appropriate tab and select the record
+        if collection == "transactions":
+            self.show_tab(self.tabs, 0)  # Finance tab
             finance_tab = self.tabs.widget(0)
             finance_sub_tabs = finance_tab.findChild(QTabWidget)
-            finance_sub_tabs.setCurrentIndex(1)  # Transactions sub-tab
-            
-            # Find and select the matching transaction
-            for row in range(self.trans_table.rowCount()):
-                table_item = self.trans_table.item(row, 4)  # Description column
-                if table_item and item_text in table_item.text():
-                    self.trans_table.selectRow(row)
-                    break
-        
-        elif category == "Aadhar Cards":
-            self.tabs.setCurrentIndex(1)  # Documents tab
-            doc_sub_tabs = self.tabs.widget(1).findChild(QTabWidget)
-            doc_sub_tabs.setCurrentIndex(0)  # Aadhar sub-tab
-            
-            # Find and select the matching Aadhar card
-            for i in range(self.aadhar_list.count()):
-                list_item = self.aadhar_list.item(i)
-                if list_item and item_text in list_item.text():
-                    self.aadhar_list.setCurrentItem(list_item)
-                    self.display_aadhar_details(list_item)
-                    break
-        
-        elif category == "PAN Cards":
-            self.tabs.setCurrentIndex(1)  # Documents tab
-            doc_sub_tabs = self.tabs.widget(1).findChild(QTabWidget)
-            doc_sub_tabs.setCurrentIndex(1)  # PAN sub-tab
-            
-            # Find and select the matching PAN card
-            for i in range(self.pan_list.count()):
-                list_item = self.pan_list.item(i)
-                if list_item and item_text in list_item.text():
-                    self.pan_list.setCurrentItem(list_item)
-                    self.display_pan_details(list_item)
-                    break
-        
-        elif category == "Bank Accounts":
-            self.tabs.setCurrentIndex(1)  # Documents tab
-            doc_sub_tabs = self.tabs.widget(1).findChild(QTabWidget)
-            doc_sub_tabs.setCurrentIndex(2)  # Bank sub-tab
-            
-            # Find and select the matching bank account
-            for i in range(self.bank_list.count()):
-                list_item = self.bank_list.item(i)
-                if list_item and item_text in list_item.text():
-                    self.bank_list.setCurrentItem(list_item)
-                    self.display_bank_details(list_item)
-                    break
-        
-        elif category == "Driving Licenses":
-            self.tabs.setCurrentIndex(1)  # Documents tab
-            doc_sub_tabs = self.tabs.widget(1).findChild(QTabWidget)
-            doc_sub_tabs.setCurrentIndex(3)  # License sub-tab
-            
-            # Find and select the matching driving license
-            for i in range(self.dl_list.count()):
-                list_item = self.dl_list.item(i)
-                if list_item and item_text in list_item.text():
-                    self.dl_list.setCurrentItem(list_item)
-                    self.display_dl_details(list_item)
-                    break
-        
-        elif category == "Certificates":
-            self.tabs.setCurrentIndex(1)  # Documents tab
-            doc_sub_tabs = self.tabs.widget(1).findChild(QTabWidget)
-            doc_sub_tabs.setCurrentIndex(4)  # Certificates sub-tab
-            
-            # Find and select the matching certificate
-            for i in range(self.cert_list.count()):
-                list_item = self.cert_list.item(i)
-                if list_item and item_text in list_item.text():
-                    self.cert_list.setCurrentItem(list_item)
-                    self.display_cert_details(list_item)
-                    break
+            self.show_tab(finance_sub_tabs, 1)  # Transactions sub-tab
+
+            # Unfiltered, table rows are positions in self.transactions, newest first
+            if not self.trans_model.showing_all:
+                self.load_transactions()
+            row = self.trans_model.model_row(self.record_index.row(collection, self.transactions, record["_id"]))
+            self.trans_model.ensure_loaded(row)
+            self.trans_table.selectRow(row)
+            self.trans_table.scrollTo(self.trans_model.index(row, 0))
+            return
+
+        # Documents sub-tab, list attribute, list refresh and details display per collection
+        sub_tab, list_name, refresh, display = {
+            "aadhar": (0, "aadhar_list", self.update_aadhar_list, self.display_aadhar_details),
+            "pan": (1, "pan_list", self.update_pan_list, self.display_pan_details),
+            "bank_accounts": (2, "bank_list", self.update_bank_list, self.display_bank_details),
+            "driving_license": (3, "dl_list", self.update_dl_list, self.display_dl_details),
+            "certificates": (4, "cert_list", self.update_cert_list, self.display_cert_details)
+        }[collection]
+        self.show_tab(self.tabs, 1)  # Documents tab
+        doc_sub_tabs = self.tabs.widget(1).findChild(QTabWidget)
+        self.show_tab(doc_sub_tabs, sub_tab)
+
+        list_widget = getattr(self, list_name)
+        row = self.record_index.row(collection, self.documents[collection], record["_id"])
+        list_item = list_widget.item(row)
+        if list_item is None or list_item.data(RECORD_ID_ROLE) != record["_id"]:
+            # The list is showing a filtered subset; show everything so rows line up again
+            refresh()
+            list_item = list_widget.item(row)
+        list_widget.setCurrentItem(list_item)
+        display(list_item)
 
     def highlight_search_query(self, query, results):
         highlighted_results = ""
@@ -986,7 +3414,7 @@ class DocumentManagerApp(QMainWindow):
         header_layout.setContentsMargins(0, 0, 0, 0)
 
         icon_label = QLabel()
-        pixmap = QPixmap('icons/login.png').scaled(48, 48, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        pixmap = self.icons.pixmap('login.png', 48)
         icon_label.setPixmap(pixmap)
 
         title_label = QLabel("Welcome to FinanceDocManager")
@@ -1312,6 +3740,15 @@ class DocumentManagerApp(QMainWindow):
         restore_action.triggered.connect(self.restore_data)
         file_menu.addAction(restore_action)
 
+        differential_action = QAction('Differential Backup', self)
+        differential_action.setShortcut("Ctrl+Shift+B")
+        differential_action.triggered.connect(self.differential_backup)
+        file_menu.addAction(differential_action)
+
+        restore_chain_action = QAction('Restore Backup Chain', self)
+        restore_chain_action.triggered.connect(self.restore_backup_chain)
+        file_menu.addAction(restore_chain_action)
+
         file_menu.addSeparator()
 
         exit_action = QAction('Exit', self)
@@ -1352,9 +3789,8 @@ class DocumentManagerApp(QMainWindow):
         about_action.triggered.connect(self.show_about)
         help_menu.addAction(about_action)
 
-    def init_finance_tab(self):
+    def init_finance_tab(self, finance_tab):
         """Initialize the finance management tab"""
-        finance_tab = QWidget()
         finance_layout = QVBoxLayout(finance_tab)
         finance_layout.setContentsMargins(5, 5, 5, 5)
         finance_layout.setSpacing(10)
@@ -1370,28 +3806,17 @@ class DocumentManagerApp(QMainWindow):
         finance_sub_tabs.setDocumentMode(True)
         finance_sub_tabs.setTabPosition(QTabWidget.North)
 
-        # Add Transaction Tab
-        add_trans_tab = QWidget()
-        self.init_add_transaction_tab(add_trans_tab)
-
-        # View Transactions Tab
-        view_trans_tab = QWidget()
-        self.init_view_transactions_tab(view_trans_tab)
-
-        # Statistics Tab
-        stats_tab = QWidget()
-        self.init_stats_tab(stats_tab)
-
-        finance_sub_tabs.addTab(add_trans_tab, "Add Transaction")
-        finance_sub_tabs.addTab(view_trans_tab, "Transactions")
-        finance_sub_tabs.addTab(stats_tab, "Statistics")
+        self.add_lazy_tab(finance_sub_tabs, self.init_add_transaction_tab, "Add Transaction")
+        self.add_lazy_tab(finance_sub_tabs, self.init_view_transactions_tab, "Transactions")
+        self.add_lazy_tab(finance_sub_tabs, self.init_stats_tab, "Statistics")
+        finance_sub_tabs.currentChanged.connect(
+            lambda index: self.build_lazy_tab(finance_sub_tabs.widget(index)))
+        self.build_lazy_tab(finance_sub_tabs.currentWidget())
 
         finance_layout.addWidget(finance_sub_tabs)
-        self.tabs.addTab(finance_tab, QIcon('icons/finance.png'), "Finance")
 
-    def init_documents_tab(self):
+    def init_documents_tab(self, documents_tab):
         """Initialize the document management tab"""
-        documents_tab = QWidget()
         documents_layout = QVBoxLayout(documents_tab)
         documents_layout.setContentsMargins(5, 5, 5, 5)
         documents_layout.setSpacing(5)
@@ -1407,34 +3832,16 @@ class DocumentManagerApp(QMainWindow):
         doc_sub_tabs.setDocumentMode(True)
         doc_sub_tabs.setTabPosition(QTabWidget.North)
 
-        # Aadhar Card Tab
-        aadhar_tab = QWidget()
-        self.init_aadhar_tab(aadhar_tab)
-
-        # PAN Card Tab
-        pan_tab = QWidget()
-        self.init_pan_tab(pan_tab)
-
-        # Bank Accounts Tab
-        bank_tab = QWidget()
-        self.init_bank_tab(bank_tab)
-
-        # Driving License Tab
-        dl_tab = QWidget()
-        self.init_dl_tab(dl_tab)
-
-        # Certificates Tab
-        cert_tab = QWidget()
-        self.init_certificates_tab(cert_tab)
-
-        doc_sub_tabs.addTab(aadhar_tab, QIcon('icons/aadhar.png'), "Aadhar")
-        doc_sub_tabs.addTab(pan_tab, QIcon('icons/pan.png'), "PAN")
-        doc_sub_tabs.addTab(bank_tab, QIcon('icons/bank.png'), "Bank")
-        doc_sub_tabs.addTab(dl_tab, QIcon('icons/license.png'), "License")
-        doc_sub_tabs.addTab(cert_tab, QIcon('icons/certificate.png'), "Certificates")
+        self.add_lazy_tab(doc_sub_tabs, self.init_aadhar_tab, "Aadhar", 'aadhar.png')
+        self.add_lazy_tab(doc_sub_tabs, self.init_pan_tab, "PAN", 'pan.png')
+        self.add_lazy_tab(doc_sub_tabs, self.init_bank_tab, "Bank", 'bank.png')
+        self.add_lazy_tab(doc_sub_tabs, self.init_dl_tab, "License", 'license.png')
+        self.add_lazy_tab(doc_sub_tabs, self.init_certificates_tab, "Certificates", 'certificate.png')
+        doc_sub_tabs.currentChanged.connect(
+            lambda index: self.build_lazy_tab(doc_sub_tabs.widget(index)))
+        self.build_lazy_tab(doc_sub_tabs.currentWidget())
 
         documents_layout.addWidget(doc_sub_tabs)
-        self.tabs.addTab(documents_tab, QIcon('icons/documents.png'), "Documents")
 
     def init_aadhar_tab(self, tab):
         layout = QHBoxLayout(tab)
@@ -1462,11 +3869,11 @@ class DocumentManagerApp(QMainWindow):
         self.aadhar_back_img = QLabel("Back Image: Not selected")
 
         btn_front = QPushButton("Select Front Image")
-        btn_front.setIcon(QIcon('icons/image.png'))
+        btn_front.setIcon(self.icons.icon('image.png'))
         btn_front.clicked.connect(lambda: self.select_document_image("aadhar_front"))
 
         btn_back = QPushButton("Select Back Image")
-        btn_back.setIcon(QIcon('icons/image.png'))
+        btn_back.setIcon(self.icons.icon('image.png'))
         btn_back.clicked.connect(lambda: self.select_document_image("aadhar_back"))
 
         btn_save = QPushButton("Save Aadhar Details")
@@ -1510,6 +3917,8 @@ class DocumentManagerApp(QMainWindow):
         list_layout.addWidget(self.aadhar_list)
         list_layout.addWidget(QLabel("Details:"))
         list_layout.addWidget(self.aadhar_details_display)
+        self.aadhar_preview = self.create_image_preview()
+        list_layout.addWidget(self.aadhar_preview)
 
         list_group.setLayout(list_layout)
 
@@ -1520,6 +3929,9 @@ class DocumentManagerApp(QMainWindow):
         self.update_aadhar_list()
 
     def filter_aadhar_list(self, query):
+        if self.storage.supports_queries:
+            self.update_aadhar_list(self.storage.search_documents("aadhar", query))
+            return
         query = query.lower()
         filtered_aadhar = [
             aadhar for aadhar in self.documents["aadhar"]
@@ -1558,11 +3970,11 @@ class DocumentManagerApp(QMainWindow):
         self.pan_front_img = QLabel("Front Image: Not selected")
 
         btn_front = QPushButton("Select Front Image")
-        btn_front.setIcon(QIcon('icons/image.png'))
+        btn_front.setIcon(self.icons.icon('image.png'))
         btn_front.clicked.connect(lambda: self.select_document_image("pan_front"))
 
         btn_save = QPushButton("Save PAN Details")
-        btn_save.setIcon(QIcon('icons/save.png'))
+        btn_save.setIcon(self.icons.icon('save.png'))
         btn_save.clicked.connect(self.save_pan_details)
 
         form_layout.addRow("Full Name:", self.pan_name)
@@ -1602,6 +4014,8 @@ class DocumentManagerApp(QMainWindow):
         list_layout.addWidget(self.pan_list)
         list_layout.addWidget(QLabel("Details:"))
         list_layout.addWidget(self.pan_details_display)
+        self.pan_preview = self.create_image_preview()
+        list_layout.addWidget(self.pan_preview)
 
         list_group.setLayout(list_layout)
 
@@ -1612,6 +4026,9 @@ class DocumentManagerApp(QMainWindow):
         self.update_pan_list()
 
     def filter_pan_list(self, query):
+        if self.storage.supports_queries:
+            self.update_pan_list(self.storage.search_documents("pan", query))
+            return
         query = query.lower()
         filtered_pan = [
             pan for pan in self.documents["pan"]
@@ -1647,11 +4064,11 @@ class DocumentManagerApp(QMainWindow):
         self.bank_passbook_img = QLabel("Passbook Image: Not selected")
 
         btn_passbook = QPushButton("Select Passbook Image")
-        btn_passbook.setIcon(QIcon('icons/image.png'))
+        btn_passbook.setIcon(self.icons.icon('image.png'))
         btn_passbook.clicked.connect(lambda: self.select_document_image("bank_passbook"))
 
         btn_save = QPushButton("Save Bank Account Details")
-        btn_save.setIcon(QIcon('icons/save.png'))
+        btn_save.setIcon(self.icons.icon('save.png'))
         btn_save.clicked.connect(self.save_bank_details)
 
         form_layout.addRow("Bank Name:", self.bank_name)
@@ -1691,6 +4108,8 @@ class DocumentManagerApp(QMainWindow):
         list_layout.addWidget(self.bank_list)
         list_layout.addWidget(QLabel("Details:"))
         list_layout.addWidget(self.bank_details_display)
+        self.bank_preview = self.create_image_preview()
+        list_layout.addWidget(self.bank_preview)
 
         list_group.setLayout(list_layout)
 
@@ -1701,6 +4120,9 @@ class DocumentManagerApp(QMainWindow):
         self.update_bank_list()
 
     def filter_bank_list(self, query):
+        if self.storage.supports_queries:
+            self.update_bank_list(self.storage.search_documents("bank_accounts", query))
+            return
         query = query.lower()
         filtered_bank = [
             bank for bank in self.documents["bank_accounts"]
@@ -1737,15 +4159,15 @@ class DocumentManagerApp(QMainWindow):
         self.dl_back_img = QLabel("Back Image: Not selected")
 
         btn_front = QPushButton("Select Front Image")
-        btn_front.setIcon(QIcon('icons/image.png'))
+        btn_front.setIcon(self.icons.icon('image.png'))
         btn_front.clicked.connect(lambda: self.select_document_image("dl_front"))
 
         btn_back = QPushButton("Select Back Image")
-        btn_back.setIcon(QIcon('icons/image.png'))
+        btn_back.setIcon(self.icons.icon('image.png'))
         btn_back.clicked.connect(lambda: self.select_document_image("dl_back"))
 
         btn_save = QPushButton("Save Driving License Details")
-        btn_save.setIcon(QIcon('icons/save.png'))
+        btn_save.setIcon(self.icons.icon('save.png'))
         btn_save.clicked.connect(self.save_dl_details)
 
         form_layout.addRow("Full Name:", self.dl_name)
@@ -1785,6 +4207,8 @@ class DocumentManagerApp(QMainWindow):
         list_layout.addWidget(self.dl_list)
         list_layout.addWidget(QLabel("Details:"))
         list_layout.addWidget(self.dl_details_display)
+        self.dl_preview = self.create_image_preview()
+        list_layout.addWidget(self.dl_preview)
 
         list_group.setLayout(list_layout)
 
@@ -1795,6 +4219,9 @@ class DocumentManagerApp(QMainWindow):
         self.update_dl_list()
 
     def filter_dl_list(self, query):
+        if self.storage.supports_queries:
+            self.update_dl_list(self.storage.search_documents("driving_license", query))
+            return
         query = query.lower()
         filtered_dl = [
             dl for dl in self.documents["driving_license"]
@@ -1832,11 +4259,11 @@ class DocumentManagerApp(QMainWindow):
         self.cert_image = QLabel("Certificate Image: Not selected")
 
         btn_image = QPushButton("Select Certificate Image")
-        btn_image.setIcon(QIcon('icons/image.png'))
+        btn_image.setIcon(self.icons.icon('image.png'))
         btn_image.clicked.connect(lambda: self.select_document_image("cert_image"))
 
         btn_save = QPushButton("Save Certificate Details")
-        btn_save.setIcon(QIcon('icons/save.png'))
+        btn_save.setIcon(self.icons.icon('save.png'))
         btn_save.clicked.connect(self.save_cert_details)
 
         form_layout.addRow("Certificate Name:", self.cert_name)
@@ -1876,6 +4303,8 @@ class DocumentManagerApp(QMainWindow):
         list_layout.addWidget(self.cert_list)
         list_layout.addWidget(QLabel("Details:"))
         list_layout.addWidget(self.cert_details_display)
+        self.cert_preview = self.create_image_preview()
+        list_layout.addWidget(self.cert_preview)
 
         list_group.setLayout(list_layout)
 
@@ -1886,6 +4315,9 @@ class DocumentManagerApp(QMainWindow):
         self.update_cert_list()
 
     def filter_cert_list(self, query):
+        if self.storage.supports_queries:
+            self.update_cert_list(self.storage.search_documents("certificates", query))
+            return
         query = query.lower()
         filtered_cert = [
             cert for cert in self.documents["certificates"]
@@ -1927,7 +4359,7 @@ class DocumentManagerApp(QMainWindow):
         form_layout.addRow("Description:", self.trans_description)
 
         btn_save_trans = QPushButton("Save Transaction")
-        btn_save_trans.setIcon(QIcon('icons/save.png'))
+        btn_save_trans.setIcon(self.icons.icon('save.png'))
         btn_save_trans.clicked.connect(self.save_transaction)
         form_layout.addRow(btn_save_trans)
 
@@ -1962,11 +4394,11 @@ class DocumentManagerApp(QMainWindow):
         self.filter_to_date.setDate(QDate.currentDate())
 
         btn_filter = QPushButton("Apply Filter")
-        btn_filter.setIcon(QIcon('icons/filter.png'))
+        btn_filter.setIcon(self.icons.icon('filter.png'))
         btn_filter.clicked.connect(self.apply_transaction_filter)
 
         btn_reset = QPushButton("Reset")
-        btn_reset.setIcon(QIcon('icons/reset.png'))
+        btn_reset.setIcon(self.icons.icon('reset.png'))
         btn_reset.clicked.connect(self.reset_transaction_filter)
 
         filter_layout.addWidget(QLabel("Type:"))
@@ -1984,25 +4416,33 @@ class DocumentManagerApp(QMainWindow):
         layout.addWidget(filter_group)
 
         # Transactions table
-        self.trans_table = QTableWidget()
-        self.trans_table.setColumnCount(7)
-        self.trans_table.setHorizontalHeaderLabels(["Date", "Type", "Category", "Amount", "Description", "Actions", "Edit"])
+        self.trans_table = QTableView()
+        self.trans_table.setModel(self.trans_model)
         self.trans_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.trans_table.horizontalHeader().setSectionResizeMode(6, QHeaderView.ResizeToContents)
         self.trans_table.verticalHeader().setVisible(False)
-        self.trans_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.trans_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.trans_table.setSelectionBehavior(QTableView.SelectRows)
+        self.trans_table.setEditTriggers(QTableView.NoEditTriggers)
         self.trans_table.setAlternatingRowColors(True)
+        self.trans_table.setMouseTracking(True)
+
+        # Delete/Edit buttons are painted by delegates rather than living as widgets
+        self.delete_delegate = ActionButtonDelegate("Delete", "red", self.trans_table)
+        self.delete_delegate.clicked.connect(self.delete_transaction, Qt.QueuedConnection)
+        self.trans_table.setItemDelegateForColumn(5, self.delete_delegate)
+        self.edit_delegate = ActionButtonDelegate("Edit", "blue", self.trans_table)
+        self.edit_delegate.clicked.connect(self.edit_transaction, Qt.QueuedConnection)
+        self.trans_table.setItemDelegateForColumn(6, self.edit_delegate)
 
         # Set row height to make rows wider
         self.trans_table.verticalHeader().setDefaultSectionSize(50)  # Adjust the value as needed
 
         self.trans_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #ddd;
                 border-radius: 4px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
         """)
@@ -2128,12 +4568,26 @@ class DocumentManagerApp(QMainWindow):
                 QMessageBox.warning(self, "Error", "Please enter both username and password")
                 return
 
-            # Show loading state
+            # Show loading state; bcrypt runs on a worker thread so the window stays responsive
             self.login_button.setEnabled(False)
             self.login_button.setText("Logging in...")
-            QApplication.processEvents()  # Force UI update
 
-            success, message = self.user_manager.verify_user(username, password)
+            self.run_in_background(
+                self.user_manager.verify_user, username, password,
+                on_finished=lambda result: self.finish_login(username, remember_me, result),
+                on_failed=self.login_failed)
+
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
+
+    def login_failed(self, error):
+        self.login_button.setEnabled(True)
+        self.login_button.setText("Login")
+        self.show_background_error(error)
+
+    def finish_login(self, username, remember_me, result):
+        try:
+            success, message = result
 
             if success:
                 # Successful login
@@ -2146,7 +4600,8 @@ class DocumentManagerApp(QMainWindow):
                 self.username_display.setText(f"Welcome, {username}")
                 self.user_info_widget.setVisible(True)
 
-                # Show the main tabs
+                # Show the main tabs, building the page that is shown first
+                self.build_lazy_tab(self.tabs.currentWidget())
                 self.tabs.setVisible(True)
 
                 # Update the balance display
@@ -2186,7 +4641,21 @@ class DocumentManagerApp(QMainWindow):
                 QMessageBox.warning(self, "Error", "Passwords do not match.")
                 return
 
-            success, message = self.user_manager.add_user(username, email, password)
+            self.register_button.setEnabled(False)
+            self.run_in_background(self.user_manager.add_user, username, email, password,
+                                   on_finished=self.finish_registration, on_failed=self.registration_failed)
+
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
+
+    def registration_failed(self, error):
+        self.register_button.setEnabled(True)
+        self.show_background_error(error)
+
+    def finish_registration(self, result):
+        try:
+            self.register_button.setEnabled(True)
+            success, message = result
             if success:
                 QMessageBox.information(self, "Success", message)
                 self.toggle_login_register()  # Switch back to login mode
@@ -2326,7 +4795,15 @@ class DocumentManagerApp(QMainWindow):
                 QMessageBox.warning(self, "Error", "Passwords do not match.")
                 return
 
-            success, message = self.user_manager.reset_password(token, new_password)
+            self.run_in_background(self.user_manager.reset_password, token, new_password,
+                                   on_finished=lambda result: self.finish_password_reset(dialog, result))
+
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
+
+    def finish_password_reset(self, dialog, result):
+        try:
+            success, message = result
             if success:
                 QMessageBox.information(self, "Success", message)
                 dialog.accept()
@@ -2337,6 +4814,9 @@ class DocumentManagerApp(QMainWindow):
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def logout(self):
+        # Nothing the user entered may wait in the write buffer once they are gone
+        self.flush_storage()
+
         # Hide the tabs and show the login form
         self.tabs.setVisible(False)
         self.user_info_widget.setVisible(False)
@@ -2377,9 +4857,10 @@ class DocumentManagerApp(QMainWindow):
                 "description": description
             }
 
-            self.transactions.append(transaction)
-            self.save_data()
-            self.load_transactions()
+            self.trans_model.add_transaction(self.transactions, transaction)
+            self.record_change("add", "transactions", record=transaction)
+            if not self.trans_model.showing_all:
+                self.load_transactions()
             self.update_balance()
             self.update_stats()
             QMessageBox.information(self, "Success", "Transaction saved successfully.")
@@ -2393,33 +4874,22 @@ class DocumentManagerApp(QMainWindow):
 
     def load_transactions(self, filtered_transactions=None):
         try:
-            self.trans_table.setRowCount(0)
-            transactions = filtered_transactions if filtered_transactions else self.transactions
-
-            for row, transaction in enumerate(transactions):
-                self.trans_table.insertRow(row)
-                self.trans_table.setItem(row, 0, QTableWidgetItem(transaction["date"]))
-                self.trans_table.setItem(row, 1, QTableWidgetItem(transaction["type"]))
-                self.trans_table.setItem(row, 2, QTableWidgetItem(transaction["category"]))
-                self.trans_table.setItem(row, 3, QTableWidgetItem(f"₹{transaction['amount']:.2f}"))
-                self.trans_table.setItem(row, 4, QTableWidgetItem(transaction["description"]))
-
-                delete_button = QPushButton("Delete")
-                delete_button.setStyleSheet("color: red;")
-                delete_button.clicked.connect(lambda _, r=row: self.delete_transaction(r))
-                self.trans_table.setCellWidget(row, 5, delete_button)
-
-                edit_button = QPushButton("Edit")
-                edit_button.setStyleSheet("color: blue;")
-                edit_button.clicked.connect(lambda _, r=row: self.edit_transaction(r))
-                self.trans_table.setCellWidget(row, 6, edit_button)
+            # An empty filter result is shown as empty, not as the whole history
+            if filtered_transactions is not None:
+                self.trans_model.set_transactions(filtered_transactions)
+            else:
+                self.trans_model.show_all(self.transactions)
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def edit_transaction(self, row):
         try:
-            transaction = self.transactions[row]
+            # row is the table row, which only matches self.transactions while nothing is filtered
+            record_id = self.trans_model.record_id(row)
+            transaction = self.record_index.get(record_id)[1]
+            if transaction is None:
+                return
             dialog = QDialog(self)
             dialog.setWindowTitle("Edit Transaction")
             dialog.setModal(True)
@@ -2465,8 +4935,8 @@ class DocumentManagerApp(QMainWindow):
             form_layout.addRow("Description:", trans_description)
 
             btn_save_trans = QPushButton("Save Changes")
-            btn_save_trans.setIcon(QIcon('icons/save.png'))
-            btn_save_trans.clicked.connect(lambda: self.save_edited_transaction(dialog, row, trans_type, trans_category, trans_date, trans_amount, trans_description))
+            btn_save_trans.setIcon(self.icons.icon('save.png'))
+            btn_save_trans.clicked.connect(lambda: self.save_edited_transaction(dialog, record_id, trans_type, trans_category, trans_date, trans_amount, trans_description))
             form_layout.addRow(btn_save_trans)
 
             layout.addLayout(form_layout)
@@ -2476,7 +4946,7 @@ class DocumentManagerApp(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
-    def save_edited_transaction(self, dialog, row, trans_type, trans_category, trans_date, trans_amount, trans_description):
+    def save_edited_transaction(self, dialog, record_id, trans_type, trans_category, trans_date, trans_amount, trans_description):
         try:
             type = trans_type.currentText()
             category = trans_category.currentText()
@@ -2494,6 +4964,11 @@ class DocumentManagerApp(QMainWindow):
                 QMessageBox.warning(self, "Error", "Invalid amount format.")
                 return
 
+            row = self.record_index.row("transactions", self.transactions, record_id)
+            if row is None:
+                dialog.reject()
+                return
+            old_transaction = self.transactions[row]
             self.transactions[row] = {
                 "type": type,
                 "category": category,
@@ -2502,8 +4977,12 @@ class DocumentManagerApp(QMainWindow):
                 "description": description
             }
 
-            self.save_data()
-            self.load_transactions()
+            self.record_change("update", "transactions", index=row, record=self.transactions[row],
+                               old_record=old_transaction)
+            if self.trans_model.showing_all:
+                self.trans_model.transaction_updated(row)
+            else:
+                self.load_transactions()
             self.update_balance()
             self.update_stats()
             QMessageBox.information(self, "Success", "Transaction updated successfully.")
@@ -2519,9 +4998,11 @@ class DocumentManagerApp(QMainWindow):
                                             QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
 
             if confirm == QMessageBox.Yes:
-                self.trans_table.removeRow(row)
-                del self.transactions[row]
-                self.save_data()
+                index = self.record_index.row("transactions", self.transactions, self.trans_model.record_id(row))
+                if index is None:
+                    return
+                old_transaction = self.trans_model.remove_transaction(row, self.transactions, index)
+                self.record_change("delete", "transactions", index=index, old_record=old_transaction)
                 self.update_balance()
                 self.update_stats()
 
@@ -2535,12 +5016,19 @@ class DocumentManagerApp(QMainWindow):
             from_date = self.filter_from_date.date().toString(Qt.ISODate)
             to_date = self.filter_to_date.date().toString(Qt.ISODate)
 
-            filtered_transactions = [
-                trans for trans in self.transactions
-                if (trans_type == "All" or trans["type"] == trans_type) and
-                (category == "All Categories" or trans["category"] == category) and
-                (from_date <= trans["date"] <= to_date)
-            ]
+            if self.storage.supports_queries:
+                filtered_transactions = self.storage.query_transactions(
+                    trans_type=None if trans_type == "All" else trans_type,
+                    category=None if category == "All Categories" else category,
+                    date_from=from_date, date_to=to_date)
+            else:
+                rows = self.trans_columns.select(
+                    trans_type=None if trans_type == "All" else trans_type,
+                    category=None if category == "All Categories" else category,
+                    date_from=from_date, date_to=to_date)
+                filtered_transactions = [self.transactions[row] for row in rows]
+            # Newest first, like the unfiltered view
+            filtered_transactions.reverse()
 
             self.load_transactions(filtered_transactions)
 
@@ -2553,7 +5041,8 @@ class DocumentManagerApp(QMainWindow):
             self.filter_category.setCurrentIndex(0)
             self.filter_from_date.setDate(QDate.currentDate().addMonths(-1))
             self.filter_to_date.setDate(QDate.currentDate())
-            self.load_transactions()
+            # The default view is the last month, answered from the date index
+            self.apply_transaction_filter()
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
@@ -2570,10 +5059,20 @@ class DocumentManagerApp(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
+    def transaction_totals(self):
+        return dict(self.aggregates.by_type)
+
+    def category_totals(self, trans_type):
+        return dict(self.aggregates.by_category.get(trans_type, {}))
+
+    def month_totals(self, trans_type):
+        return dict(sorted(self.aggregates.by_month.get(trans_type, {}).items()))
+
     def update_balance(self):
         try:
-            total_income = sum(trans["amount"] for trans in self.transactions if trans["type"] == "Income")
-            total_expense = sum(trans["amount"] for trans in self.transactions if trans["type"] == "Expense")
+            totals = self.transaction_totals()
+            total_income = totals["Income"]
+            total_expense = totals["Expense"]
             balance = total_income - total_expense
             self.balance_label.setText(f"Balance: ₹{balance:.2f}")
 
@@ -2581,9 +5080,12 @@ class DocumentManagerApp(QMainWindow):
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def update_stats(self):
+        if self.income_label is None:
+            return  # Statistics tab not built yet
         try:
-            total_income = sum(trans["amount"] for trans in self.transactions if trans["type"] == "Income")
-            total_expense = sum(trans["amount"] for trans in self.transactions if trans["type"] == "Expense")
+            totals = self.transaction_totals()
+            total_income = totals["Income"]
+            total_expense = totals["Expense"]
             balance = total_income - total_expense
 
             self.income_label.setText(f"₹{total_income:.2f}")
@@ -2605,36 +5107,110 @@ class DocumentManagerApp(QMainWindow):
             options = QFileDialog.Options()
             file_name, _ = QFileDialog.getOpenFileName(self, "Select Image", "", "Images (*.png *.jpg *.jpeg)", options=options)
             if file_name:
-                # Copy the selected image to the documents directory
-                doc_path = os.path.join(self.documents_dir, os.path.basename(file_name))
-                shutil.copy(file_name, doc_path)
-
-                if doc_type == "aadhar_front":
-                    self.aadhar_front_img.setText(f"Front Image: {doc_path}")
-                    self.aadhar_front_img.setStyleSheet("color: green;")
-                elif doc_type == "aadhar_back":
-                    self.aadhar_back_img.setText(f"Back Image: {doc_path}")
-                    self.aadhar_back_img.setStyleSheet("color: green;")
-                elif doc_type == "pan_front":
-                    self.pan_front_img.setText(f"Front Image: {doc_path}")
-                    self.pan_front_img.setStyleSheet("color: green;")
-                elif doc_type == "bank_passbook":
-                    self.bank_passbook_img.setText(f"Passbook Image: {doc_path}")
-                    self.bank_passbook_img.setStyleSheet("color: green;")
-                elif doc_type == "dl_front":
-                    self.dl_front_img.setText(f"Front Image: {doc_path}")
-                    self.dl_front_img.setStyleSheet("color: green;")
-                elif doc_type == "dl_back":
-                    self.dl_back_img.setText(f"Back Image: {doc_path}")
-                    self.dl_back_img.setStyleSheet("color: green;")
-                elif doc_type == "cert_image":
-                    self.cert_image.setText(f"Certificate Image: {doc_path}")
-                    self.cert_image.setStyleSheet("color: green;")
+                # Hashing and copying large scans happens off the UI thread
+                self.pending_image_copies += 1
+                self.run_in_background(self.blob_store.put, file_name,
+                                       on_finished=lambda name: self.finish_image_copy(doc_type, name),
+                                       on_failed=self.image_copy_failed)
+
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
+
+    def create_image_preview(self):
+        """Row of up to two thumbnails shown under a document's details"""
+        preview = QWidget()
+        layout = QHBoxLayout(preview)
+        layout.setContentsMargins(0, 0, 0, 0)
+        for _ in range(2):
+            label = QLabel()
+            label.setFixedSize(self.thumbnails.size, self.thumbnails.size)
+            label.setAlignment(Qt.AlignCenter)
+            label.setStyleSheet("border: 1px solid #ddd; border-radius: 4px; background-color: white;")
+            label.setVisible(False)
+            layout.addWidget(label)
+        layout.addStretch()
+        return preview
+
+    def show_image_previews(self, preview, images):
+        labels = preview.findChildren(QLabel)
+        for index, label in enumerate(labels):
+            image = images[index] if index < len(images) else None
+            path = self.blob_store.resolve(image) if image else ""
+            # Remember what the label should show; a late thumbnail for an older click is ignored
+            label.setProperty("thumbnail_path", path)
+            label.clear()
+            label.setText("Loading..." if path else "")
+            label.setVisible(bool(path))
+            if path:
+                self.thumbnails.request(path, lambda pixmap, label=label, path=path:
+                                        self.set_preview_thumbnail(label, path, pixmap))
+
+    def set_preview_thumbnail(self, label, path, pixmap):
+        if label.property("thumbnail_path") != path:
+            return
+        if pixmap is None:
+            label.setText("No preview")
+        else:
+            label.setPixmap(pixmap)
+
+    def show_list_thumbnail(self, list_widget, item, image):
+        if not image:
+            return
+        path = self.blob_store.resolve(image)
+        item.setData(Qt.UserRole, path)
+        row = list_widget.row(item)
+        self.thumbnails.request(path, lambda pixmap: self.set_list_thumbnail(list_widget, row, path, pixmap))
+
+    def set_list_thumbnail(self, list_widget, row, path, pixmap):
+        # The list may have been rebuilt before the thumbnail arrived
+        item = list_widget.item(row)
+        if pixmap is not None and item is not None and item.data(Qt.UserRole) == path:
+            item.setIcon(QIcon(pixmap))
+
+    def image_copy_failed(self, error):
+        self.pending_image_copies -= 1
+        self.show_background_error(error)
+
+    def image_copy_pending(self):
+        if self.pending_image_copies:
+            QMessageBox.warning(self, "Please Wait", "An image is still being copied. Try again in a moment.")
+            return True
+        return False
+
+    def finish_image_copy(self, doc_type, name):
+        try:
+            self.pending_image_copies -= 1
+            doc_path = self.blob_store.path(name)
+            self.thumbnails.forget(doc_path)
+
+            if doc_type == "aadhar_front":
+                self.aadhar_front_img.setText(f"Front Image: {doc_path}")
+                self.aadhar_front_img.setStyleSheet("color: green;")
+            elif doc_type == "aadhar_back":
+                self.aadhar_back_img.setText(f"Back Image: {doc_path}")
+                self.aadhar_back_img.setStyleSheet("color: green;")
+            elif doc_type == "pan_front":
+                self.pan_front_img.setText(f"Front Image: {doc_path}")
+                self.pan_front_img.setStyleSheet("color: green;")
+            elif doc_type == "bank_passbook":
+                self.bank_passbook_img.setText(f"Passbook Image: {doc_path}")
+                self.bank_passbook_img.setStyleSheet("color: green;")
+            elif doc_type == "dl_front":
+                self.dl_front_img.setText(f"Front Image: {doc_path}")
+                self.dl_front_img.setStyleSheet("color: green;")
+            elif doc_type == "dl_back":
+                self.dl_back_img.setText(f"Back Image: {doc_path}")
+                self.dl_back_img.setStyleSheet("color: green;")
+            elif doc_type == "cert_image":
+                self.cert_image.setText(f"Certificate Image: {doc_path}")
+                self.cert_image.setStyleSheet("color: green;")
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def save_aadhar_details(self):
+        if self.image_copy_pending():
+            return
         try:
             name = self.aadhar_name.text()
             number = self.aadhar_number.text()
@@ -2661,7 +5237,7 @@ class DocumentManagerApp(QMainWindow):
             }
 
             self.documents["aadhar"].append(aadhar_details)
-            self.save_data()
+            self.record_change("add", "aadhar", record=aadhar_details)
             self.update_aadhar_list()
             QMessageBox.information(self, "Success", "Aadhar details saved successfully.")
 
@@ -2682,20 +5258,26 @@ class DocumentManagerApp(QMainWindow):
         return len(number) == 12 and number.isdigit()
 
     def update_aadhar_list(self, filtered_aadhar=None):
+        if self.aadhar_list is None:
+            return
         try:
             self.aadhar_list.clear()
             aadhar_list = filtered_aadhar if filtered_aadhar else self.documents["aadhar"]
             for aadhar in aadhar_list:
                 item = QListWidgetItem(f"{aadhar['name']} ({aadhar['number']})")
-                item.setIcon(QIcon('icons/aadhar.png'))
+                item.setIcon(self.icons.icon('aadhar.png'))
+                item.setData(RECORD_ID_ROLE, aadhar.get('_id'))
                 self.aadhar_list.addItem(item)
+                self.show_list_thumbnail(self.aadhar_list, item, aadhar.get('front_image'))
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def display_aadhar_details(self, item):
         try:
-            aadhar = self.documents["aadhar"][self.aadhar_list.row(item)]
+            aadhar = self.record_index.get(item.data(RECORD_ID_ROLE))[1]
+            if aadhar is None:
+                return
             details = f"""
             Name: {aadhar['name']}
             Aadhar Number: {aadhar['number']}
@@ -2705,11 +5287,14 @@ class DocumentManagerApp(QMainWindow):
             Back Image: {aadhar['back_image']}
             """
             self.aadhar_details_display.setText(details)
+            self.show_image_previews(self.aadhar_preview, [aadhar.get('front_image'), aadhar.get('back_image')])
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def save_pan_details(self):
+        if self.image_copy_pending():
+            return
         try:
             name = self.pan_name.text()
             number = self.pan_number.text()
@@ -2734,7 +5319,7 @@ class DocumentManagerApp(QMainWindow):
             }
 
             self.documents["pan"].append(pan_details)
-            self.save_data()
+            self.record_change("add", "pan", record=pan_details)
             self.update_pan_list()
             QMessageBox.information(self, "Success", "PAN details saved successfully.")
 
@@ -2753,20 +5338,26 @@ class DocumentManagerApp(QMainWindow):
         return bool(re.match(r'^[A-Z]{5}\d{4}[A-Z]\$', number))
 
     def update_pan_list(self, filtered_pan=None):
+        if self.pan_list is None:
+            return
         try:
             self.pan_list.clear()
             pan_list = filtered_pan if filtered_pan else self.documents["pan"]
             for pan in pan_list:
                 item = QListWidgetItem(f"{pan['name']} ({pan['number']})")
-                item.setIcon(QIcon('icons/pan.png'))
+                item.setIcon(self.icons.icon('pan.png'))
+                item.setData(RECORD_ID_ROLE, pan.get('_id'))
                 self.pan_list.addItem(item)
+                self.show_list_thumbnail(self.pan_list, item, pan.get('front_image'))
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def display_pan_details(self, item):
         try:
-            pan = self.documents["pan"][self.pan_list.row(item)]
+            pan = self.record_index.get(item.data(RECORD_ID_ROLE))[1]
+            if pan is None:
+                return
             details = f"""
             Name: {pan['name']}
             PAN Number: {pan['number']}
@@ -2775,11 +5366,14 @@ class DocumentManagerApp(QMainWindow):
             Front Image: {pan['front_image']}
             """
             self.pan_details_display.setText(details)
+            self.show_image_previews(self.pan_preview, [pan.get('front_image')])
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def save_bank_details(self):
+        if self.image_copy_pending():
+            return
         try:
             name = self.bank_name.text()
             account_number = self.bank_account_number.text()
@@ -2806,7 +5400,7 @@ class DocumentManagerApp(QMainWindow):
             }
 
             self.documents["bank_accounts"].append(bank_details)
-            self.save_data()
+            self.record_change("add", "bank_accounts", record=bank_details)
             self.update_bank_list()
             QMessageBox.information(self, "Success", "Bank account details saved successfully.")
 
@@ -2827,20 +5421,26 @@ class DocumentManagerApp(QMainWindow):
         return bool(re.match(r'^[A-Za-z]{4}0[A-Z0-9]{6}\$', ifsc))
 
     def update_bank_list(self, filtered_bank=None):
+        if self.bank_list is None:
+            return
         try:
             self.bank_list.clear()
             bank_list = filtered_bank if filtered_bank else self.documents["bank_accounts"]
             for bank in bank_list:
                 item = QListWidgetItem(f"{bank['name']} ({bank['account_number']})")
-                item.setIcon(QIcon('icons/bank.png'))
+                item.setIcon(self.icons.icon('bank.png'))
+                item.setData(RECORD_ID_ROLE, bank.get('_id'))
                 self.bank_list.addItem(item)
+                self.show_list_thumbnail(self.bank_list, item, bank.get('passbook_image'))
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def display_bank_details(self, item):
         try:
-            bank = self.documents["bank_accounts"][self.bank_list.row(item)]
+            bank = self.record_index.get(item.data(RECORD_ID_ROLE))[1]
+            if bank is None:
+                return
             details = f"""
             Bank Name: {bank['name']}
             Account Number: {bank['account_number']}
@@ -2850,11 +5450,14 @@ class DocumentManagerApp(QMainWindow):
             Passbook Image: {bank['passbook_image']}
             """
             self.bank_details_display.setText(details)
+            self.show_image_previews(self.bank_preview, [bank.get('passbook_image')])
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def save_dl_details(self):
+        if self.image_copy_pending():
+            return
         try:
             name = self.dl_name.text()
             number = self.dl_number.text()
@@ -2877,7 +5480,7 @@ class DocumentManagerApp(QMainWindow):
             }
 
             self.documents["driving_license"].append(dl_details)
-            self.save_data()
+            self.record_change("add", "driving_license", record=dl_details)
             self.update_dl_list()
             QMessageBox.information(self, "Success", "Driving license details saved successfully.")
 
@@ -2894,20 +5497,26 @@ class DocumentManagerApp(QMainWindow):
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def update_dl_list(self, filtered_dl=None):
+        if self.dl_list is None:
+            return
         try:
             self.dl_list.clear()
             dl_list = filtered_dl if filtered_dl else self.documents["driving_license"]
             for dl in dl_list:
                 item = QListWidgetItem(f"{dl['name']} ({dl['number']})")
-                item.setIcon(QIcon('icons/license.png'))
+                item.setIcon(self.icons.icon('license.png'))
+                item.setData(RECORD_ID_ROLE, dl.get('_id'))
                 self.dl_list.addItem(item)
+                self.show_list_thumbnail(self.dl_list, item, dl.get('front_image'))
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def display_dl_details(self, item):
         try:
-            dl = self.documents["driving_license"][self.dl_list.row(item)]
+            dl = self.record_index.get(item.data(RECORD_ID_ROLE))[1]
+            if dl is None:
+                return
             details = f"""
             Name: {dl['name']}
             License Number: {dl['number']}
@@ -2917,11 +5526,14 @@ class DocumentManagerApp(QMainWindow):
             Back Image: {dl['back_image']}
             """
             self.dl_details_display.setText(details)
+            self.show_image_previews(self.dl_preview, [dl.get('front_image'), dl.get('back_image')])
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def save_cert_details(self):
+        if self.image_copy_pending():
+            return
         try:
             name = self.cert_name.text()
             issuer = self.cert_issuer.text()
@@ -2942,7 +5554,7 @@ class DocumentManagerApp(QMainWindow):
             }
 
             self.documents["certificates"].append(cert_details)
-            self.save_data()
+            self.record_change("add", "certificates", record=cert_details)
             self.update_cert_list()
             QMessageBox.information(self, "Success", "Certificate details saved successfully.")
 
@@ -2957,20 +5569,26 @@ class DocumentManagerApp(QMainWindow):
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def update_cert_list(self, filtered_cert=None):
+        if self.cert_list is None:
+            return
         try:
             self.cert_list.clear()
             cert_list = filtered_cert if filtered_cert else self.documents["certificates"]
             for cert in cert_list:
                 item = QListWidgetItem(f"{cert['name']} ({cert['issuer']})")
-                item.setIcon(QIcon('icons/certificate.png'))
+                item.setIcon(self.icons.icon('certificate.png'))
+                item.setData(RECORD_ID_ROLE, cert.get('_id'))
                 self.cert_list.addItem(item)
+                self.show_list_thumbnail(self.cert_list, item, cert.get('image'))
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def display_cert_details(self, item):
         try:
-            cert = self.documents["certificates"][self.cert_list.row(item)]
+            cert = self.record_index.get(item.data(RECORD_ID_ROLE))[1]
+            if cert is None:
+                return
             details = f"""
             Certificate Name: {cert['name']}
             Issuing Authority: {cert['issuer']}
@@ -2979,218 +5597,359 @@ class DocumentManagerApp(QMainWindow):
             Certificate Image: {cert['image']}
             """
             self.cert_details_display.setText(details)
+            self.show_image_previews(self.cert_preview, [cert.get('image')])
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
     def save_data(self):
         try:
-            data = {
-                "transactions": self.transactions,
-                "documents": self.documents
-            }
-            with open(os.path.join(self.data_dir, 'data.json'), 'w') as file:
-                json.dump(data, file, indent=4)
+            self.storage.save(self.transactions, self.documents)
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
-    def load_data(self):
+    def record_change(self, op, collection, index=None, record=None, old_record=None):
+        """Hand a single add/update/delete to the storage backend instead of rewriting everything"""
         try:
-            data_file = os.path.join(self.data_dir, 'data.json')
-            if os.path.exists(data_file):
-                with open(data_file, 'r') as file:
-                    data = json.load(file)
-                    self.transactions = data.get("transactions", [])
-                    self.documents = data.get("documents", {
-                        "aadhar": [],
-                        "pan": [],
-                        "bank_accounts": [],
-                        "driving_license": [],
-                        "certificates": []
-                    })
+            # Revision stamps let differential backups pick out what changed
+            if op in ("add", "update"):
+                self.stamp(record, old_record.get("_id") if old_record else None)
+            elif op == "delete" and not collection.startswith("_") and self.has_backup_chain():
+                # Differential backups replay these; without a backup to build on they are not kept
+                tombstone = {"collection": collection}
+                self.stamp(tombstone, old_record.get("_id"))
+                self.documents.setdefault("_tombstones", []).append(tombstone)
+                self.storage.append("add", "_tombstones", None, tombstone)
+
+            if op == "add":
+                self.search_index.add(collection, record)
+            elif op == "update":
+                self.search_index.replace(collection, old_record, record)
+            elif op == "delete":
+                self.search_index.remove(collection, old_record)
+
+            if not collection.startswith("_"):
+                if op == "add":
+                    self.record_index.add(collection, record)
+                elif op == "update":
+                    self.record_index.replace(collection, old_record, record)
+                elif op == "delete":
+                    self.record_index.remove(collection, old_record)
+
+            if collection == "transactions":
+                if op == "add":
+                    self.trans_columns.append(record)
+                    self.aggregates.add(record)
+                elif op == "update":
+                    self.trans_columns.update(index, record)
+                    self.aggregates.replace(old_record, record)
+                elif op == "delete":
+                    self.trans_columns.delete(index)
+                    self.aggregates.remove(old_record)
+            else:
+                if old_record is not None:
+                    self.blob_store.unref(old_record)
+                if record is not None:
+                    self.blob_store.ref(record)
 
-                    # Load document images
-                    for doc_type, docs in self.documents.items():
-                        for doc in docs:
-                            for key in ["front_image", "back_image", "passbook_image", "image"]:
-                                if key in doc:
-                                    doc[key] = os.path.join(self.documents_dir, doc[key])
+            # The storage may address the row by _id; on update the new record keeps the old one's
+            record_id = (record if record is not None else old_record or {}).get("_id")
+            if self.storage.append(op, collection, index, record, record_id):
+                self.compact_journal()
+            self.schedule_flush()
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
-    def backup_data(self):
-        try:
-            options = QFileDialog.Options()
-            file_name, _ = QFileDialog.getSaveFileName(self, "Backup Data", "", "CSV Files (*.csv);;JSON Files (*.json);;XML Files (*.xml)", options=options)
-            if file_name:
-                if file_name.endswith('.csv'):
-                    self.save_data_as_csv(file_name)
-                elif file_name.endswith('.json'):
-                    self.save_data_as_json(file_name)
-                elif file_name.endswith('.xml'):
-                    self.save_data_as_xml(file_name)
-                QMessageBox.information(self, "Success", "Data backed up successfully.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
-
+    def schedule_flush(self):
+        now = time.monotonic()
+        if self.dirty_since is None:
+            self.dirty_since = now
+        remaining = self.save_interval - (now - self.dirty_since) * 1000
+        if remaining <= 0:
+            # Changes kept coming for a whole interval; write what has piled up
+            self.flush_storage()
+            return
+        # Restarted by every change, so a burst is written once it goes quiet
+        self.flush_timer.start(int(min(250, remaining)))
 
-    def save_data_as_csv(self, file_name):
+    def flush_storage(self):
+        self.flush_timer.stop()
+        self.dirty_since = None
         try:
-            with open(file_name, mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(["Type", "Category", "Date", "Amount", "Description"])
-                for transaction in self.transactions:
-                    writer.writerow([transaction["type"], transaction["category"], transaction["date"], transaction["amount"], transaction["description"]])
+            self.storage.flush()
+
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
-    def save_data_as_json(self, file_name):
+    def closeEvent(self, event):
+        self.flush_storage()
+        super().closeEvent(event)
+
+    def stamp(self, record, record_id=None):
+        self.revision += 1
+        if record_id is None:
+            record_id = record.get("_id")
+        if record_id is None:
+            record_id = self.next_record_id
+            self.next_record_id += 1
+        record["_id"] = record_id
+        record["_rev"] = self.revision
+
+    def stamp_revisions(self, floor=0):
+        """Pick up the revision counter from the data and number unnumbered records; True if any were"""
+        records = list(self.transactions)
+        for docs in self.documents.values():
+            records.extend(docs)
+        self.revision = max([floor] + [record.get("_rev", 0) for record in records])
+        self.next_record_id = max((record.get("_id", 0) for record in records), default=0) + 1
+        unnumbered = [record for record in records if "_id" not in record]
+        for record in unnumbered:
+            self.stamp(record)
+        return bool(unnumbered)
+
+    def has_backup_chain(self):
+        return QSettings("FinanceDocManager", "AppSettings").value("last_backup_revision") is not None
+
+    def compact_journal(self):
         try:
-            data = {
-                "transactions": self.transactions,
-                "documents": self.documents
-            }
-            with open(file_name, 'w') as file:
-                json.dump(data, file, indent=4)
+            self.storage.compact(self.transactions, self.documents)
+
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
-    def save_data_as_xml(self, file_name):
+    def load_data(self):
         try:
-            root = ET.Element("data")
-
-            transactions = ET.SubElement(root, "transactions")
-            for trans in self.transactions:
-                trans_elem = ET.SubElement(transactions, "transaction")
-                for key, value in trans.items():
-                    ET.SubElement(trans_elem, key).text = str(value)
+            self.transactions, self.documents = self.storage.load()
+            recovered = bool(self.storage.recovery)
+            if recovered:
+                QMessageBox.warning(self, "Data Recovered", "\n\n".join(self.storage.recovery))
 
-            documents = ET.SubElement(root, "documents")
+            # Load document images
             for doc_type, docs in self.documents.items():
-                doc_type_elem = ET.SubElement(documents, doc_type)
                 for doc in docs:
-                    doc_elem = ET.SubElement(doc_type_elem, "document")
-                    for key, value in doc.items():
-                        ET.SubElement(doc_elem, key).text = str(value)
+                    for key in ["front_image", "back_image", "passbook_image", "image"]:
+                        if key in doc:
+                            doc[key] = os.path.join(self.documents_dir, doc[key])
+
+            # Tombstones only matter to differentials taken after the last backup
+            last_backup = QSettings("FinanceDocManager", "AppSettings").value("last_backup_revision")
+            pruned = self.prune_tombstones(None if last_backup is None else int(last_backup))
+            if self.stamp_revisions() or recovered or pruned:
+                # Persist new record ids and pruned tombstones, or replace the snapshot the load had to work around
+                self.save_data()
+
+            self.trans_columns.rebuild(self.transactions)
+            self.record_index.rebuild(self.transactions, self.documents)
+            self.search_index.rebuild(self.transactions, self.documents)
+            self.aggregates.rebuild(self.trans_columns)
+            self.blob_store.rebuild(self.documents)
+            if not recovered:
+                # After a fallback load the records may be older than the images on disk
+                self.run_in_background(self.blob_store.collect_garbage, on_finished=self.report_collected_blobs)
+                self.run_in_background(self.thumbnails.collect_garbage,
+                                       [self.blob_store.path(name) for name in self.blob_store.refcounts])
 
-            tree = ET.ElementTree(root)
-            tree.write(file_name, encoding='utf-8', xml_declaration=True)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
-    def restore_data(self):
+    def report_collected_blobs(self, moved):
+        if moved:
+            print(f"Moved {len(moved)} unreferenced document images to {self.blob_store.trash}")
+
+    def backup_data(self):
+        self.write_backup(differential=False)
+
+    def differential_backup(self):
+        self.write_backup(differential=True)
+
+    def write_backup(self, differential):
         try:
+            settings = QSettings("FinanceDocManager", "AppSettings")
+            since = settings.value("last_backup_revision")
+            if differential and since is None:
+                QMessageBox.warning(self, "Error", "Make a full backup first; differential backups build on it.")
+                return
+
             options = QFileDialog.Options()
-            file_name, _ = QFileDialog.getOpenFileName(self, "Restore Data", "", "JSON Files (*.json);;CSV Files (*.csv);;XML Files (*.xml)", options=options)
+            title = "Differential Backup" if differential else "Backup Data"
+            formats = "JSON Files (*.json);;XML Files (*.xml);;Binary Backups (*.pimb)"
+            if not differential:
+                formats = "CSV Files (*.csv);;" + formats
+            file_name, _ = QFileDialog.getSaveFileName(self, title, "", formats, options=options)
             if file_name:
-                if file_name.endswith('.json'):
-                    self.load_data_from_json(file_name)
-                elif file_name.endswith('.csv'):
-                    self.load_data_from_csv(file_name)
+                # The worker writes from shallow copies, so the lists can change while it runs
+                if differential:
+                    # Only records stamped after the last backup, plus the deletions since then
+                    since = int(since)
+                    meta = {"kind": "delta", "since": since, "revision": self.revision}
+                    transactions = [trans for trans in self.transactions if trans.get("_rev", 0) > since]
+                    documents = {doc_type: [doc for doc in docs if doc.get("_rev", 0) > since]
+                                 for doc_type, docs in self.documents.items() if doc_type != "_backup"}
+                else:
+                    meta = {"kind": "full", "revision": self.revision}
+                    transactions = list(self.transactions)
+                    documents = {doc_type: list(docs) for doc_type, docs in self.documents.items()
+                                 if not doc_type.startswith("_")}
+                if file_name.endswith('.csv') and not differential:
+                    writer, args = iter_csv_export, (transactions,)
+                elif file_name.endswith('.json'):
+                    writer, args = iter_json_export, (transactions, documents, meta)
                 elif file_name.endswith('.xml'):
-                    self.load_data_from_xml(file_name)
+                    writer, args = iter_xml_export, (transactions, documents, meta)
+                elif file_name.endswith('.pimb'):
+                    writer, args = iter_binary_export, (transactions, documents, meta)
                 else:
                     QMessageBox.warning(self, "Error", "Unsupported file format.")
                     return
-
-                self.load_transactions()
-                self.update_balance()
-                self.update_stats()
-                self.update_aadhar_list()
-                self.update_pan_list()
-                self.update_bank_list()
-                self.update_dl_list()
-                self.update_cert_list()
-                QMessageBox.information(self, "Success", "Data restored successfully.")
-
+                # CSV has no room for the revision, so it cannot start a chain
+                revision = None if writer is iter_csv_export else self.revision
+                self.run_with_progress("Backing up data...", writer, file_name, *args,
+                                       on_finished=lambda completed: self.finish_backup(completed, revision,
+                                                                                        differential))
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
-    def load_data_from_json(self, file_name):
-        try:
-            with open(file_name, 'r') as file:
-                data = json.load(file)
-                self.transactions = data.get("transactions", [])
-                self.documents = data.get("documents", {
-                    "aadhar": [],
-                    "pan": [],
-                    "bank_accounts": [],
-                    "driving_license": [],
-                    "certificates": []
-                })
+    def finish_backup(self, completed, revision=None, differential=False):
+        if completed:
+            if revision is not None:
+                settings = QSettings("FinanceDocManager", "AppSettings")
+                settings.setValue("last_backup_revision", revision)
+                if not differential and self.prune_tombstones(revision):
+                    self.save_data()
+            QMessageBox.information(self, "Success", "Data backed up successfully.")
+        else:
+            self.statusBar().showMessage("Backup cancelled", 5000)
+
+    def prune_tombstones(self, revision):
+        """Drop deletions a backup already reflects (all of them when revision is None); True if any were"""
+        tombstones = self.documents.get("_tombstones", [])
+        kept = [] if revision is None else [tombstone for tombstone in tombstones
+                                            if tombstone.get("_rev", 0) > revision]
+        if len(kept) == len(tombstones):
+            return False
+        self.documents["_tombstones"] = kept
+        return True
 
-                # Load document images
-                for doc_type, docs in self.documents.items():
-                    for doc in docs:
-                        for key in ["front_image", "back_image", "passbook_image", "image"]:
-                            if key in doc:
-                                doc[key] = os.path.join(self.documents_dir, doc[key])
+    def restore_data(self):
+        try:
+            options = QFileDialog.Options()
+            file_name, _ = QFileDialog.getOpenFileName(self, "Restore Data", "", "JSON Files (*.json);;CSV Files (*.csv);;XML Files (*.xml);;Binary Backups (*.pimb)", options=options)
+            if file_name:
+                reader = BACKUP_READERS.get(os.path.splitext(file_name)[1].lower())
+                if reader is None:
+                    QMessageBox.warning(self, "Error", "Unsupported file format.")
+                    return
+                meta = read_backup_meta(file_name)
+                if meta is not None and meta.get("kind") == "delta":
+                    QMessageBox.warning(self, "Error", "This is a differential backup. Use 'Restore Backup Chain' "
+                                                       "and select it together with its full backup.")
+                    return
+                self.begin_restore("Restoring data...", reader, file_name)
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
-    def load_data_from_csv(self, file_name):
+    def restore_backup_chain(self):
         try:
-            self.transactions = []
-            self.documents = {
-                "aadhar": [],
-                "pan": [],
-                "bank_accounts": [],
-                "driving_license": [],
-                "certificates": []
-            }
-
-            with open(file_name, mode='r', newline='') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    transaction = {
-                        "type": row["Type"],
-                        "category": row["Category"],
-                        "date": row["Date"],
-                        "amount": float(row["Amount"]),
-                        "description": row["Description"]
-                    }
-                    self.transactions.append(transaction)
+            options = QFileDialog.Options()
+            file_names, _ = QFileDialog.getOpenFileNames(self, "Restore Backup Chain", "", "Backups (*.json *.xml *.pimb)", options=options)
+            if file_names:
+                self.begin_restore("Restoring backup chain...", iter_backup_chain, file_names)
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
-    def load_data_from_xml(self, file_name):
+    def begin_restore(self, label, reader, *args):
+        # The file is parsed on a worker and merged in batches; the current data is
+        # kept aside so a cancelled or failed restore can put it back
+        self.restore_previous = (self.transactions, self.documents)
+        self.restore_revision = 0
+        self.transactions = []
+        self.documents = {
+            "aadhar": [],
+            "pan": [],
+            "bank_accounts": [],
+            "driving_license": [],
+            "certificates": []
+        }
+        self.trans_columns.clear()
+        self.aggregates.rebuild(self.trans_columns)
+        self.trans_model.show_all(self.transactions)
+        self.update_balance()
+        self.compaction_timer.stop()
+        self.run_with_progress(label, reader, *args,
+                               on_step=self.on_restore_batch,
+                               on_finished=self.finish_restore,
+                               on_failed=self.restore_failed)
+
+    def on_restore_batch(self, batch):
         try:
-            self.transactions = []
-            self.documents = {
-                "aadhar": [],
-                "pan": [],
-                "bank_accounts": [],
-                "driving_license": [],
-                "certificates": []
-            }
+            collection, records = batch
+            if collection == "transactions":
+                self.transactions.extend(records)
+                self.trans_columns.extend(records)
+                for transaction in records:
+                    self.aggregates.add(transaction)
+                self.trans_model.transactions_appended()
+                self.update_balance()
+            elif collection == "_backup":
+                self.restore_revision = records[0].get("revision", 0)
+            else:
+                # Load document images
+                for doc in records:
+                    for key in ["front_image", "back_image", "passbook_image", "image"]:
+                        if doc.get(key):
+                            doc[key] = os.path.join(self.documents_dir, doc[key])
+                self.documents.setdefault(collection, []).extend(records)
 
-            tree = ET.parse(file_name)
-            root = tree.getroot()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
-            for trans_elem in root.findall(".//transaction"):
-                transaction = {
-                    "type": trans_elem.find("type").text,
-                    "category": trans_elem.find("category").text,
-                    "date": trans_elem.find("date").text,
-                    "amount": float(trans_elem.find("amount").text),
-                    "description": trans_elem.find("description").text
-                }
-                self.transactions.append(transaction)
+    def finish_restore(self, completed):
+        try:
+            self.compaction_timer.start()
+            if not completed:
+                self.transactions, self.documents = self.restore_previous
+                self.trans_columns.rebuild(self.transactions)
+                self.record_index.rebuild(self.transactions, self.documents)
+                self.aggregates.rebuild(self.trans_columns)
+                self.refresh_data_views()
+                self.statusBar().showMessage("Restore cancelled", 5000)
+                return
 
-            for doc_type in self.documents.keys():
-                for doc_elem in root.findall(f".//{doc_type}/document"):
-                    doc = {}
-                    for key in doc_elem:
-                        doc[key.tag] = key.text
-                    self.documents[doc_type].append(doc)
+            # Restored data replaces the store wholesale, so write a full snapshot
+            self.restore_previous = None
+            # Revisions already handed to a backup must not be reused, or the next
+            # differential backup would miss the records stamped with them
+            settings = QSettings("FinanceDocManager", "AppSettings")
+            last_backup = int(settings.value("last_backup_revision") or 0)
+            self.stamp_revisions(max(self.restore_revision, last_backup))
+            self.save_data()
+            self.record_index.rebuild(self.transactions, self.documents)
+            self.search_index.rebuild(self.transactions, self.documents)
+            self.blob_store.rebuild(self.documents)
+            self.refresh_data_views()
+            QMessageBox.information(self, "Success", "Data restored successfully.")
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
+    def restore_failed(self, error):
+        self.finish_restore(False)
+        self.show_background_error(error)
+
+    def refresh_data_views(self):
+        self.load_transactions()
+        self.update_balance()
+        self.update_stats()
+        self.update_aadhar_list()
+        self.update_pan_list()
+        self.update_bank_list()
+        self.update_dl_list()
+        self.update_cert_list()
+
     def show_calculator(self):
         try:
             os.system("calc.exe")
@@ -3247,7 +6006,7 @@ class DocumentManagerApp(QMainWindow):
 
             # Add button
             add_button = QPushButton("Add Tab")
-            add_button.setIcon(QIcon('icons/add.png'))
+            add_button.setIcon(self.icons.icon('add.png'))
             add_button.clicked.connect(lambda: self.add_custom_tab(dialog))
             layout.addWidget(add_button)
 
@@ -3271,7 +6030,7 @@ class DocumentManagerApp(QMainWindow):
             self.init_custom_tab(new_tab, tab_name, fields.split(','))
 
             # Add the new tab to the main tab widget
-            self.tabs.addTab(new_tab, QIcon('icons/custom.png'), tab_name)
+            self.tabs.addTab(new_tab, self.icons.icon('custom.png'), tab_name)
 
             # Close the dialog
             dialog.accept()
@@ -3311,7 +6070,7 @@ class DocumentManagerApp(QMainWindow):
 
             # Add a save button
             save_button = QPushButton("Save Details")
-            save_button.setIcon(QIcon('icons/save.png'))
+            save_button.setIcon(self.icons.icon('save.png'))
             save_button.clicked.connect(lambda: self.save_custom_details(tab_name))
             form_layout.addRow(save_button)
 
@@ -3371,7 +6130,7 @@ class DocumentManagerApp(QMainWindow):
                 return
 
             self.documents[tab_name].append(details)
-            self.save_data()
+            self.record_change("add", tab_name, record=details)
             self.update_custom_list(tab_name)
             QMessageBox.information(self, "Success", f"{tab_name} details saved successfully.")
 
@@ -3387,9 +6146,10 @@ class DocumentManagerApp(QMainWindow):
             self.custom_list.clear()
             custom_list = filtered_custom if filtered_custom else self.documents[tab_name]
             for details in custom_list:
-                item_text = ", ".join(f"{key}: {value}" for key, value in details.items())
+                item_text = ", ".join(f"{key}: {value}" for key, value in details.items() if not key.startswith("_"))
                 item = QListWidgetItem(item_text)
-                item.setIcon(QIcon('icons/custom.png'))
+                item.setIcon(self.icons.icon('custom.png'))
+                item.setData(RECORD_ID_ROLE, details.get('_id'))
                 self.custom_list.addItem(item)
 
         except Exception as e:
@@ -3397,8 +6157,10 @@ class DocumentManagerApp(QMainWindow):
 
     def display_custom_details(self, item, tab_name):
         try:
-            details = self.documents[tab_name][self.custom_list.row(item)]
-            details_text = "\n".join(f"{key}: {value}" for key, value in details.items())
+            details = self.record_index.get(item.data(RECORD_ID_ROLE))[1]
+            if details is None:
+                return
+            details_text = "\n".join(f"{key}: {value}" for key, value in details.items() if not key.startswith("_"))
             self.custom_details_display.setText(details_text)
 
         except Exception as e:
@@ -3408,7 +6170,7 @@ class DocumentManagerApp(QMainWindow):
         query = query.lower()
         filtered_custom = [
             details for details in self.documents[tab_name]
-            if any(query in value.lower() for value in details.values())
+            if any(query in value.lower() for key, value in details.items() if not key.startswith("_"))
         ]
         self.update_custom_list(tab_name, filtered_custom)
 
@@ -3488,7 +6250,7 @@ class DocumentManagerApp(QMainWindow):
             form_layout.addRow(confirm_password_label, confirm_password_input)
 
             btn_save_profile = QPushButton("Save Changes")
-            btn_save_profile.setIcon(QIcon('icons/save.png'))
+            btn_save_profile.setIcon(self.icons.icon('save.png'))
             btn_save_profile.clicked.connect(lambda: self.save_profile_changes(dialog, email_input, password_input, confirm_password_input))
             form_layout.addRow(btn_save_profile)
 
@@ -3509,14 +6271,19 @@ class DocumentManagerApp(QMainWindow):
                 QMessageBox.warning(self, "Error", "Passwords do not match.")
                 return
 
-            if new_password:
-                hashed_password = bcrypt.hashpw(new_password.encode(), bcrypt.gensalt())
-                self.user_manager.users[self.current_user]["password"] = hashed_password.decode()
+            self.run_in_background(self.user_manager.update_profile, self.current_user, email, new_password,
+                                   on_finished=lambda result: self.finish_profile_update(dialog, result))
 
-            self.user_manager.users[self.current_user]["email"] = email
-            self.user_manager.save_users()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
-            QMessageBox.information(self, "Success", "Profile updated successfully.")
+    def finish_profile_update(self, dialog, result):
+        try:
+            success, message = result
+            if not success:
+                QMessageBox.warning(self, "Error", message)
+                return
+            QMessageBox.information(self, "Success", message)
             dialog.accept()
 
         except Exception as e:
@@ -3533,85 +6300,23 @@ class DocumentManagerApp(QMainWindow):
             return
 
         query = query.lower()
-        results = {
-            "Transactions": [],
-            "Aadhar Cards": [],
-            "PAN Cards": [],
-            "Bank Accounts": [],
-            "Driving Licenses": [],
-            "Certificates": []
-        }
-
-        # Search transactions
-        filtered_transactions = [
-            trans for trans in self.transactions
-            if query in trans["description"].lower() or
-            query in trans["category"].lower() or
-            query in trans["date"].lower() or
-            query in str(trans["amount"])
-        ]
-        for trans in filtered_transactions:
-            results["Transactions"].append(f"{trans['date']} - {trans['category']}: {trans['description']} (₹{trans['amount']})")
-
-        # Search Aadhar cards
-        filtered_aadhar = [
-            aadhar for aadhar in self.documents["aadhar"]
-            if query in aadhar["name"].lower() or
-            query in aadhar["number"].lower() or
-            query in aadhar["dob"].lower() or
-            query in aadhar["address"].lower()
-        ]
-        for aadhar in filtered_aadhar:
-            results["Aadhar Cards"].append(f"{aadhar['name']} ({aadhar['number']}) - {aadhar['dob']}")
-
-        # Search PAN cards
-        filtered_pan = [
-            pan for pan in self.documents["pan"]
-            if query in pan["name"].lower() or
-            query in pan["number"].lower() or
-            query in pan["dob"].lower() or
-            query in pan["address"].lower()
-        ]
-        for pan in filtered_pan:
-            results["PAN Cards"].append(f"{pan['name']} ({pan['number']}) - {pan['dob']}")
-
-        # Search Bank accounts
-        filtered_bank = [
-            bank for bank in self.documents["bank_accounts"]
-            if query in bank["name"].lower() or
-            query in bank["account_number"].lower() or
-            query in bank["ifsc"].lower() or
-            query in bank["branch"].lower() or
-            query in bank["address"].lower()
-        ]
-        for bank in filtered_bank:
-            results["Bank Accounts"].append(f"{bank['name']} ({bank['account_number']}) - {bank['ifsc']}")
-
-        # Search Driving licenses
-        filtered_dl = [
-            dl for dl in self.documents["driving_license"]
-            if query in dl["name"].lower() or
-            query in dl["number"].lower() or
-            query in dl["dob"].lower() or
-            query in dl["address"].lower()
-        ]
-        for dl in filtered_dl:
-            results["Driving Licenses"].append(f"{dl['name']} ({dl['number']}) - {dl['dob']}")
-
-        # Search Certificates
-        filtered_cert = [
-            cert for cert in self.documents["certificates"]
-            if query in cert["name"].lower() or
-            query in cert["issuer"].lower() or
-            query in cert["date"].lower() or
-            query in cert["description"].lower()
-        ]
-        for cert in filtered_cert:
-            results["Certificates"].append(f"{cert['name']} ({cert['issuer']}) - {cert['date']}")
+        results = {}
+        for category, matches in self.search_index.search(query).items():
+            results[category] = [(record.get("_id"), self.format_search_result(collection, record))
+                                 for collection, record in matches]
 
         # Show search results popup
         self.show_search_results_popup(query, results)
 
+    def format_search_result(self, collection, record):
+        if collection == "transactions":
+            return f"{record['date']} - {record['category']}: {record['description']} (₹{record['amount']})"
+        elif collection == "bank_accounts":
+            return f"{record['name']} ({record['account_number']}) - {record['ifsc']}"
+        elif collection == "certificates":
+            return f"{record['name']} ({record['issuer']}) - {record['date']}"
+        return f"{record['name']} ({record['number']}) - {record['dob']}"
+
     def export_data(self):
         try:
             options = QFileDialog.Options()
@@ -3636,22 +6341,13 @@ class DocumentManagerApp(QMainWindow):
 
     def generate_report_text(self):
         try:
-            total_income = sum(trans["amount"] for trans in self.transactions if trans["type"] == "Income")
-            total_expense = sum(trans["amount"] for trans in self.transactions if trans["type"] == "Expense")
+            totals = self.transaction_totals()
+            total_income = totals["Income"]
+            total_expense = totals["Expense"]
             balance = total_income - total_expense
 
-            income_by_category = {}
-            expense_by_category = {}
-
-            for trans in self.transactions:
-                if trans["type"] == "Income":
-                    if trans["category"] not in income_by_category:
-                        income_by_category[trans["category"]] = 0
-                    income_by_category[trans["category"]] += trans["amount"]
-                elif trans["type"] == "Expense":
-                    if trans["category"] not in expense_by_category:
-                        expense_by_category[trans["category"]] = 0
-                    expense_by_category[trans["category"]] += trans["amount"]
+            income_by_category = self.category_totals("Income")
+            expense_by_category = self.category_totals("Expense")
 
             report_text = f"""
             Total Income: ₹{total_income:.2f}
@@ -3667,6 +6363,14 @@ class DocumentManagerApp(QMainWindow):
             for category, amount in expense_by_category.items():
                 report_text += f"{category}: ₹{amount:.2f}\n"
 
+            report_text += "\nIncome by Month:\n"
+            for month, amount in self.month_totals("Income").items():
+                report_text += f"{month}: ₹{amount:.2f}\n"
+
+            report_text += "\nExpense by Month:\n"
+            for month, amount in self.month_totals("Expense").items():
+                report_text += f"{month}: ₹{amount:.2f}\n"
+
             return report_text
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
@@ -3688,7 +6392,9 @@ class DocumentManagerApp(QMainWindow):
     def get_notifications(self):
         try:
             today = QDate.currentDate()
-            upcoming_bills = [trans for trans in self.transactions if trans["type"] == "Expense" and QDate.fromString(trans["date"], Qt.ISODate) <= today.addDays(7)]
+            rows = self.trans_columns.select(trans_type="Expense",
+                                             date_to=today.addDays(7).toString(Qt.ISODate))
+            upcoming_bills = [self.transactions[row] for row in rows]
             notifications = [f"Upcoming bill: {trans['description']} on {trans['date']}" for trans in upcoming_bills]
             return notifications
         except Exception as e:
@@ -3746,12 +6452,14 @@ class DocumentManagerApp(QMainWindow):
 
     def create_pie_chart(self):
         try:
-            total_income = sum(trans["amount"] for trans in self.transactions if trans["type"] == "Income")
-            total_expense = sum(trans["amount"] for trans in self.transactions if trans["type"] == "Expense")
+            totals = self.transaction_totals()
+            total_income = totals["Income"]
+            total_expense = totals["Expense"]
 
             labels = ['Income', 'Expense']
             sizes = [total_income, total_expense]
             colors = ['#2ecc71', '#e74c3c']
+            plt, FigureCanvas = load_charting()
             fig, ax = plt.subplots()
             ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
             ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
@@ -3764,16 +6472,12 @@ class DocumentManagerApp(QMainWindow):
 
     def create_income_bar_chart(self):
         try:
-            income_by_category = {}
-            for trans in self.transactions:
-                if trans["type"] == "Income":
-                    if trans["category"] not in income_by_category:
-                        income_by_category[trans["category"]] = 0
-                    income_by_category[trans["category"]] += trans["amount"]
+            income_by_category = self.category_totals("Income")
 
             categories = list(income_by_category.keys())
             amounts = list(income_by_category.values())
 
+            plt, FigureCanvas = load_charting()
             fig, ax = plt.subplots()
             ax.bar(categories, amounts, color='#2ecc71')
             ax.set_xlabel('Categories')
@@ -3788,16 +6492,12 @@ class DocumentManagerApp(QMainWindow):
 
     def create_expense_bar_chart(self):
         try:
-            expense_by_category = {}
-            for trans in self.transactions:
-                if trans["type"] == "Expense":
-                    if trans["category"] not in expense_by_category:
-                        expense_by_category[trans["category"]] = 0
-                    expense_by_category[trans["category"]] += trans["amount"]
+            expense_by_category = self.category_totals("Expense")
 
             categories = list(expense_by_category.keys())
             amounts = list(expense_by_category.values())
 
+            plt, FigureCanvas = load_charting()
             fig, ax = plt.subplots()
             ax.bar(categories, amounts, color='#e74c3c')
             ax.set_xlabel('Categories')
@@ -3811,6 +6511,12 @@ class DocumentManagerApp(QMainWindow):
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
 if __name__ == "__main__":
+    if "--benchmark-bcrypt" in sys.argv:
+        print("bcrypt cost  time per hash")
+        for rounds, seconds in UserManager.benchmark_work_factors().items():
+            print(f"{rounds:>11}  {seconds * 1000:.1f} ms")
+        sys.exit(0)
+
     app = QApplication(sys.argv)
 
     # Set application font
@@ -3821,6 +6527,7 @@ if __name__ == "__main__":
 
     window = DocumentManagerApp()
     window.show()
+    QTimer.singleShot(0, window.report_startup_timings)
     sys.exit(app.exec_())
 
 